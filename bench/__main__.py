@@ -0,0 +1,6 @@
+""" python -m bench：运行解析热点基准，见 bench.suite """
+from bench.suite import main
+
+
+if __name__ == '__main__':
+    main()
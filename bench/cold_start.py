@@ -0,0 +1,117 @@
+""" 任务冷启动基准：每个 cron 任务的导入耗时，以及从进程启动到第一次联网的耗时
+
+每个任务在独立的子进程里按 crontab 里的参数运行（与 scheduler.discover_jobs 相同），子进程里替换
+socket.getaddrinfo / socket.socket.connect：第一次联网时记录耗时并立即退出，所以不会真的请求上游，
+也不会发出通知。没有联网就结束的（如 news_ai_explain 不在播报时间、非交易日）记录退出耗时。
+
+输出列:
+    import   导入任务模块的耗时(ms)
+    net      从开始导入到第一次联网的耗时(ms)，没有联网为 -
+    exit     没有联网、main 直接返回的耗时(ms)，联网的为 -
+    wall     父进程看到的子进程总耗时(ms)，含解释器启动
+
+用法:
+    python -m bench.cold_start                       # 所有任务，各跑3次取中位数
+    python -m bench.cold_start -n 5 finance.lof_discount finance.news_ai_explain
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from scheduler import discover_jobs
+
+
+ROOT = Path(__file__).resolve().parent.parent
+MARKER = '@@cold_start '
+TIMEOUT = 30  # 没有联网、也不退出的任务（如盘中监控在本地数据上空转）超时记为 timeout
+
+CHILD = r'''
+import importlib, json, os, socket, sys, threading, time
+
+t0 = time.perf_counter()
+result = {'import': None, 'net': None, 'exit': None}
+done = threading.Lock()  # 多个线程同时联网时只记录第一个
+
+def report():
+    print(%(marker)r + json.dumps(result), flush=True)
+
+def first_network(*args, **kwargs):
+    done.acquire()
+    result['net'] = (time.perf_counter() - t0) * 1000
+    report()
+    os._exit(0)
+
+socket.getaddrinfo = first_network
+socket.socket.connect = first_network
+socket.create_connection = first_network
+
+module = importlib.import_module(%(module)r)
+result['import'] = (time.perf_counter() - t0) * 1000
+try:
+    module.main(%(argv)r)
+except SystemExit:
+    pass
+done.acquire()
+result['exit'] = (time.perf_counter() - t0) * 1000
+report()
+os._exit(0)
+'''
+
+
+def run_once(module: str, argv: list) -> dict:
+    code = CHILD % {'marker': MARKER, 'module': module, 'argv': list(argv)}
+    started = time.perf_counter()
+    try:
+        proc = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, timeout=TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return {'status': 'timeout'}
+    wall = (time.perf_counter() - started) * 1000
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(MARKER):
+            result = json.loads(line[len(MARKER):])
+            result.update(status='ok', wall=wall)
+            return result
+    error = (proc.stderr.strip().splitlines() or ['?'])[-1]
+    return {'status': f'error: {error}'}
+
+
+def median(runs: list, key: str):
+    values = [r[key] for r in runs if r.get(key) is not None]
+    return statistics.median(values) if values else None
+
+
+def fmt(value) -> str:
+    return '-' if value is None else f'{value:.1f}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='任务冷启动基准')
+    parser.add_argument('modules', nargs='*', help='只测这些模块，默认所有带 @crontab 的任务')
+    parser.add_argument('-n', '--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    jobs, seen = [], set()
+    for job in discover_jobs():
+        if (args.modules and job.module not in args.modules) or job.module in seen:
+            continue
+        seen.add(job.module)
+        jobs.append(job)
+
+    print(f"{'job':<34} {'import':>8} {'net':>8} {'exit':>8} {'wall':>8}")
+    for job in jobs:
+        runs = [run_once(job.module, job.argv) for _ in range(args.repeat)]
+        ok = [r for r in runs if r['status'] == 'ok']
+        if not ok:
+            print(f"{job.module:<34} {runs[-1]['status']}")
+            continue
+        label = ' '.join([job.module] + list(job.argv))
+        print(f"{label:<34} {fmt(median(ok, 'import')):>8} {fmt(median(ok, 'net')):>8} "
+              f"{fmt(median(ok, 'exit')):>8} {fmt(median(ok, 'wall')):>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+""" 所有上游接口的本地替身，用于没有网络时压测各任务的完整流程
+
+任务进程设置 MOCK_UPSTREAM=http://127.0.0.1:8900 后，common.upstream.url() 把接口地址改写成
+http://127.0.0.1:8900/<原host>/<原path>，通知渠道换成 common.notify.MockChannel（POST /notify/<渠道>/<方法>）。
+响应按各接口的真实格式生成，列表类数据取自 bench/fixtures（与 python -m bench 共用）：
+
+| 上游                               | 响应                                              |
+| qt.gtimg.cn/q=...                  | 请求的每个代码一条行情，价格随机游走              |
+| fund.eastmoney.com/pingzhongdata   | pingzhongdata_511880.js.gz，带 ETag                |
+| api.fund.eastmoney.com/f10/lsjz    | 同一份净值的最后 pageSize 条                      |
+| newsapi.eastmoney.com/kuaixun      | news_page.js.gz，时间平移到现在，第 i 页依次更早  |
+| datacenter-web.eastmoney.com       | 今天和两天后各一只可转债申购                      |
+| www.jisilu.cn/data/lof             | jisilu_lof.json.gz，带 ETag，If-None-Match 命中返回 304 |
+| timor.tech/api/holiday             | 主要法定节假日                                    |
+| api.jiucaishuo.com/v2/kjtl         | kjtl_plain.json 按接口方式加密                    |
+| api.open-meteo.com/v1/forecast     | 随机天气                                          |
+| */chat/completions                 | bench.openai_stub（OPENAI_BASE_URL 同样会被改写） |
+| open.feishu.cn、/notify/*          | 记录后返回成功                                    |
+
+--latency/--jitter 控制每个请求的延迟(秒)，--error-rate 按比例返回 503，--scale 把快讯、LOF 列表放大 N 倍。
+GET /_stats 返回各接口的请求数、错误数、字节数和服务端耗时，Ctrl-C 退出时也会打印。
+finance.stock_index_summary 的指数行情经 easyquotation 请求，地址不受 MOCK_UPSTREAM 控制。
+
+用法:
+    python -m bench.mock_server --port 8900 --latency 0.05 --jitter 0.02 --error-rate 0.01
+    MOCK_UPSTREAM=http://127.0.0.1:8900 python -m finance.lof_discount
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from zoneinfo import ZoneInfo
+
+from bench import openai_stub, suite
+from finance.nav_store import parse_pingzhong
+
+
+TZ = ZoneInfo('Asia/Shanghai')
+HOLIDAYS = {  # 月-日 -> 名称
+    '01-01': '元旦', '05-01': '劳动节', '05-02': '劳动节', '05-03': '劳动节',
+    '10-01': '国庆节', '10-02': '国庆节', '10-03': '国庆节', '10-04': '国庆节', '10-05': '国庆节',
+}
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+def json_response(obj, status: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    return status, dict({'Content-Type': 'application/json; charset=utf-8'}, **(headers or {})), \
+        json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+class Upstream:
+    """ 各接口的响应生成，fixture 只读一次 """
+
+    def __init__(self, scale: int = 1, seed: int = 0):
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.prices: Dict[str, float] = {}
+        self.pingzhong_body = gzip.decompress((suite.FIXTURES / suite.nav_trend.FIXTURE.name).read_bytes())
+        self.nav_points = parse_pingzhong(self.pingzhong_body)['points']
+        self.pingzhong_etag = '"%s"' % hashlib.md5(self.pingzhong_body).hexdigest()
+        news = json.loads(gzip.decompress((suite.FIXTURES / suite.NEWS_PAGE).read_bytes()).decode('utf-8').split('=', 1)[1])
+        self.news = news['LivesList'] * scale
+        jisilu = json.loads(gzip.decompress((suite.FIXTURES / suite.JISILU_LOF).read_bytes()))
+        rows = [dict(row, id=f'{row["id"]}{k or ""}') for k in range(scale) for row in jisilu['rows']]
+        self.jisilu_body = json.dumps(dict(jisilu, rows=rows, total=len(rows)), ensure_ascii=False).encode('utf-8')
+        self.jisilu_etag = '"%s"' % hashlib.md5(self.jisilu_body).hexdigest()
+        self.kjtl_body = json.dumps(suite.encrypt_kjtl((suite.FIXTURES / suite.KJTL_PLAIN).read_bytes())).encode()
+
+    def _price(self, symbol: str) -> float:
+        code = symbol[-6:]
+        base = 100.0 if code.startswith('511') else 1.6 if code.startswith(('204', '1318')) else 3500.0
+        with self.lock:
+            price = self.prices.get(symbol, base)
+            price = self.prices[symbol] = max(base * 0.5, price * (1 + self.rng.gauss(0, 0.0002)))
+        return price
+
+    def quote(self, match, query, headers) -> Response:
+        symbols = [s for s in match.group(1).split(',') if s]
+        lines = []
+        for symbol in symbols:
+            price = self._price(symbol)
+            fields = ['1', f'名称{symbol[-6:]}', symbol[-6:], f'{price:.3f}', f'{price:.3f}', f'{price:.3f}'] + ['0'] * 26
+            fields += [f'{self.rng.uniform(-1, 1):.2f}'] + [''] * 55
+            lines.append(f'v_{symbol}="{"~".join(fields)}";\n')
+        return 200, {'Content-Type': 'text/html; charset=GBK'}, ''.join(lines).encode('gbk')
+
+    def pingzhong(self, match, query, headers) -> Response:
+        if headers.get('If-None-Match') == self.pingzhong_etag:
+            return 304, {'ETag': self.pingzhong_etag}, b''
+        return 200, {'Content-Type': 'application/javascript', 'ETag': self.pingzhong_etag}, self.pingzhong_body
+
+    def lsjz(self, match, query, headers) -> Response:
+        size = int(query.get('pageSize', ['20'])[0])
+        rows = [{'FSRQ': datetime.fromtimestamp(x / 1000, TZ).strftime('%Y-%m-%d'), 'DWJZ': f'{y:.4f}'}
+                for x, y in reversed(self.nav_points[-size:])]
+        return json_response({'Data': {'LSJZList': rows}, 'ErrCode': 0, 'TotalCount': len(self.nav_points)})
+
+    def news_page(self, match, query, headers) -> Response:
+        page = int(match.group(1))
+        first = datetime.strptime(self.news[0]['showtime'], '%Y-%m-%d %H:%M:%S')
+        span = first - datetime.strptime(self.news[-1]['showtime'], '%Y-%m-%d %H:%M:%S') + timedelta(minutes=1)
+        top = datetime.now(TZ).replace(tzinfo=None, microsecond=0) - span * (page - 1)
+        lives = []
+        for i, item in enumerate(self.news):
+            showtime = (top - (first - datetime.strptime(item['showtime'], '%Y-%m-%d %H:%M:%S'))).strftime('%Y-%m-%d %H:%M:%S')
+            news_id = f'{page}{i:04d}{item["id"]}'
+            lives.append(dict(item, id=news_id, newsid=news_id, showtime=showtime, ordertime=showtime))
+        body = json.dumps({'rc': 1, 'me': '', 'LivesList': lives}, ensure_ascii=False, separators=(',', ':'))
+        return 200, {'Content-Type': 'text/html; charset=utf-8'}, f'var ajaxResult={body}'.encode('utf-8')
+
+    def cb_calendar(self, match, query, headers) -> Response:
+        today = datetime.now(TZ).date()
+        rows = [{'SECURITY_NAME_ABBR': name, 'SECUCODE': code, 'VALUE_DATE': f'{day.isoformat()} 00:00:00'}
+                for name, code, day in (('模拟转债', '123999.SZ', today), ('测试转债', '113999.SH', today + timedelta(days=2)))]
+        return json_response({'version': None, 'result': {'pages': 1, 'data': rows, 'count': len(rows)}, 'success': True})
+
+    def jisilu(self, match, query, headers) -> Response:
+        if headers.get('If-None-Match') == self.jisilu_etag:
+            return 304, {'ETag': self.jisilu_etag}, b''
+        return 200, {'Content-Type': 'application/json', 'ETag': self.jisilu_etag}, self.jisilu_body
+
+    def holiday(self, match, query, headers) -> Response:
+        year = match.group(1)
+        holidays = {md: {'holiday': True, 'name': name, 'wage': 3, 'date': f'{year}-{md}'} for md, name in HOLIDAYS.items()}
+        return json_response({'code': 0, 'holiday': holidays})
+
+    def kjtl(self, match, query, headers) -> Response:
+        return 200, {'Content-Type': 'application/json'}, self.kjtl_body
+
+    def weather(self, match, query, headers) -> Response:
+        code = self.rng.choice([0, 1, 3, 61, 63, 80])
+        return json_response({'current': {'time': datetime.now(TZ).strftime('%Y-%m-%dT%H:%M'), 'weather_code': code,
+                                          'rain': round(self.rng.uniform(0.1, 5), 1) if code >= 50 else 0.0}})
+
+    def ok(self, match, query, headers) -> Response:
+        return json_response({'code': 0, 'msg': 'success'})
+
+
+def routes(upstream: Upstream) -> List[Tuple[str, re.Pattern, Callable]]:
+    """ (名称, 匹配 /host/path 的正则, 处理函数(match, query, headers) -> (状态码, 响应头, body)) """
+    table = [
+        ('quote', r'/qt\.gtimg\.cn/q=([^/?]*)', upstream.quote),
+        ('pingzhong', r'/fund\.eastmoney\.com/pingzhongdata/\d+\.js', upstream.pingzhong),
+        ('lsjz', r'/api\.fund\.eastmoney\.com/f10/lsjz', upstream.lsjz),
+        ('news', r'/newsapi\.eastmoney\.com/kuaixun/v1/getlist_102_ajaxResult_\d+_(\d+)_\.html', upstream.news_page),
+        ('cb_calendar', r'/datacenter-web\.eastmoney\.com/api/data/v1/get', upstream.cb_calendar),
+        ('jisilu', r'/www\.jisilu\.cn/data/lof/index_lof_list/?', upstream.jisilu),
+        ('holiday', r'/timor\.tech/api/holiday/year/(\d{4})', upstream.holiday),
+        ('kjtl', r'/api\.jiucaishuo\.com/v2/kjtl/kjtlconnect', upstream.kjtl),
+        ('weather', r'/api\.open-meteo\.com/v1/forecast', upstream.weather),
+        ('feishu_webhook', r'/open\.feishu\.cn/open-apis/bot/v2/hook/.*', upstream.ok),
+        ('notify', r'/notify/\w+/\w+', upstream.ok),
+    ]
+    return [(name, re.compile(pattern), handler) for name, pattern, handler in table]
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes: Dict[str, dict] = {}
+
+    def record(self, route: str, status: int, size: int, seconds: float):
+        with self.lock:
+            s = self.routes.setdefault(route, {'requests': 0, 'errors': 0, 'bytes': 0, 'latencies': []})
+            s['requests'] += 1
+            s['errors'] += status >= 500
+            s['bytes'] += size
+            s['latencies'].append(seconds)
+
+    def summary(self) -> Dict[str, dict]:
+        with self.lock:
+            result = {}
+            for route, s in sorted(self.routes.items()):
+                lat = sorted(s['latencies'])
+                result[route] = {'requests': s['requests'], 'errors': s['errors'], 'bytes': s['bytes'],
+                                 'mean_ms': round(sum(lat) / len(lat) * 1000, 1), 'p95_ms': round(lat[int(len(lat) * 0.95)] * 1000, 1)}
+            return result
+
+
+class Handler(openai_stub.Handler):
+    table: List[Tuple[str, re.Pattern, Callable]] = []
+    stats = Stats()
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+
+    def _delay_or_fail(self) -> bool:
+        """ 模拟网络延迟；按 error_rate 返回 503，返回 True 表示已经失败 """
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        if random.random() < self.error_rate:
+            self._send(503, {'Content-Type': 'text/plain'}, b'mock upstream error')
+            return True
+        return False
+
+    def _send(self, status: int, headers: Dict[str, str], body: bytes):
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        started = time.monotonic()
+        parts = urlsplit(self.path)
+        self.rfile.read(int(self.headers.get('Content-Length', 0) or 0))
+        if parts.path == '/_stats':
+            status, headers, data = json_response(self.stats.summary())
+            self._send(status, headers, data)
+            return
+        for name, pattern, handler in self.table:
+            match = pattern.fullmatch(parts.path)
+            if not match:
+                continue
+            if self._delay_or_fail():
+                self.stats.record(name, 503, 0, time.monotonic() - started)
+                return
+            try:
+                status, headers, data = handler(match, parse_qs(parts.query), self.headers)
+            except Exception as e:
+                status, headers, data = 500, {'Content-Type': 'text/plain'}, f'{type(e).__name__}: {e}'.encode()
+            self._send(status, headers, data)
+            self.stats.record(name, status, len(data), time.monotonic() - started)
+            return
+        self._send(404, {'Content-Type': 'text/plain'}, f'no mock for {parts.path}'.encode())
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        if self.path.rstrip('/').endswith('/chat/completions'):
+            started = time.monotonic()
+            if not self._delay_or_fail():
+                super().do_POST()
+            self.stats.record('openai', 200, 0, time.monotonic() - started)
+            return
+        self._handle()
+
+
+def serve(port: int = 8900, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+          scale: int = 1, chunk_delay: float = 0.0) -> ThreadingHTTPServer:
+    Handler.table = routes(Upstream(scale))
+    Handler.stats = Stats()
+    Handler.latency, Handler.jitter, Handler.error_rate = latency, jitter, error_rate
+    Handler.chunk_delay = chunk_delay
+    return ThreadingHTTPServer(('127.0.0.1', port), Handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='上游接口本地替身')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的延迟(秒)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='延迟的随机波动(秒)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回 503 的比例')
+    parser.add_argument('--scale', type=int, default=1, help='快讯、LOF 列表放大倍数')
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help='LLM 流式输出每块的间隔(秒)')
+    args = parser.parse_args(argv)
+
+    server = serve(args.port, args.latency, args.jitter, args.error_rate, args.scale, args.chunk_delay)
+    print(f'mock upstream listening on http://127.0.0.1:{args.port}  (MOCK_UPSTREAM=http://127.0.0.1:{args.port})')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(Handler.stats.summary(), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
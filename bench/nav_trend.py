@@ -0,0 +1,112 @@
+""" pingzhongdata 净值解析基准：原 fetch_fund_history 的整文件正则+json.loads vs nav_store 的尾部扫描
+
+fixture 为 bench/fixtures/pingzhongdata_511880.js.gz，按 pingzhongdata 的格式生成（2013 年至今约 3200 个交易日的
+Data_netWorthTrend，另有累计净值、累计收益率等数组，与线上文件体量相当）。
+
+用法:
+    python -m bench.nav_trend                 # 比较 CPU 时间和 tracemalloc 峰值
+    python -m bench.nav_trend --make-fixture  # 重新生成 fixture
+"""
+import gzip
+import json
+import random
+import re
+import sys
+import timeit
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+from finance.nav_store import _date_to_ms, parse_pingzhong
+
+
+FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'pingzhongdata_511880.js.gz'
+
+
+def make_fixture(path: Path = FIXTURE, start: date = date(2013, 1, 28), end: date = date(2026, 10, 16)):
+    rng = random.Random(511880)
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    days = [d for d in days if d.weekday() < 5]
+    nav, trend, ac_worth, grand_total = 100.0, [], [], []
+    for i, day in enumerate(days):
+        gain = round(rng.uniform(0.004, 0.009) * (3 if day.weekday() == 4 else 1), 4)
+        unit_money = ''
+        if day.month == 12 and day.day >= 28 and not any(t['unitMoney'] for t in trend[-5:]):
+            unit_money = f'每份派现金{nav - 100:.4f}元'
+            nav = 100.0
+        nav = round(nav + gain, 4)
+        x = _date_to_ms(day)
+        trend.append({'x': x, 'y': nav, 'equityReturn': round(gain / nav * 100, 4), 'unitMoney': unit_money})
+        ac_worth.append([x, round(100 + i * 0.0065, 4)])
+        grand_total.append([x, round(i * 0.0065, 4)])
+
+    def dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+    js = ''.join([
+        '/*基金或股票信息*/var ishb=false;/*基金或股票信息*/var fS_name = "银华日利ETF";var fS_code = "511880";',
+        '/*原费率*/var fund_sourceRate="0.00";/*现费率*/var fund_Rate="0.00";/*最小申购金额*/var fund_minsg="100";',
+        '/*基金持仓股票代码*/var stockCodes=[];/*基金持仓债券代码*/var zqCodes = "";',
+        '/*收益率*//*近一年收益率*/var syl_1n="1.5023";/*近6月收益率*/var syl_6y="0.7412";',
+        '/*股票仓位测算图*/var Data_fundSharesPositions = [];',
+        f'/*单位净值走势 equityReturn-净值回报 unitMoney-每份派送金*/var Data_netWorthTrend = {dumps(trend)};',
+        f'/*累计净值走势*/var Data_ACWorthTrend = {dumps(ac_worth)};',
+        '/*累计收益率走势*/var Data_grandTotal = ',
+        dumps([{'name': name, 'data': grand_total} for name in ('银华日利ETF', '同类平均', '沪深300')]), ';',
+        f'/*同类排名走势*/var Data_rateInSimilarType = {dumps([{"x": x, "y": rng.randint(1, 900), "sc": "900"} for x, _ in ac_worth])};',
+        '/*同类排名百分比*/var Data_rateInSimilarPersent=[];/*规模变动 mom-较上期环比*/var Data_fluctuationScale = {};',
+    ])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(gzip.compress(js.encode('utf-8'), mtime=0))
+    print(f'{path}: {len(js.encode("utf-8")) / 1024:.0f}KB, {len(trend)} 条净值')
+
+
+def legacy_parse(raw: bytes):
+    """ 原 fetch_fund_history 的解析逻辑 """
+    js_content = raw.decode('utf-8')
+    name_match = re.search(r'fS_name\s*=\s*[\'"]([^\'"]+)[\'"]', js_content)
+    name = name_match.group(1) if name_match else ''
+    match = re.search(r'Data_netWorthTrend\s*=\s*(\[.*?\]);', js_content, re.DOTALL)
+    data_str = re.sub(r'new Date\((\d{4}),(\d{1,2}),(\d{1,2})\)', r'"\1-\2-\3"', match.group(1))
+    history_data = json.loads(data_str)
+    return {'name': name, 'history': history_data[-20:][::-1]}
+
+
+def tail_parse(raw: bytes, last: int = 20):
+    data = parse_pingzhong(raw, last)
+    return {'name': data['name'], 'history': [{'x': x, 'y': y} for x, y in reversed(data['points'])]}
+
+
+def measure(func, raw: bytes):
+    number = 20
+    best = min(timeit.repeat(lambda: func(raw), number=number, repeat=5)) / number
+    tracemalloc.start()
+    func(raw)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def run():
+    if not FIXTURE.exists():
+        make_fixture()
+    raw = gzip.decompress(FIXTURE.read_bytes())
+    legacy, tail = legacy_parse(raw), tail_parse(raw)
+    assert legacy['name'] == tail['name']
+    assert [(h['x'], h['y']) for h in legacy['history']] == [(h['x'], h['y']) for h in tail['history']]
+
+    print(f'payload {len(raw) / 1024:.0f}KB')
+    print(f"{'parser':<24} {'cpu(ms)':>9} {'peak(KB)':>9}")
+    base_time, base_peak = measure(legacy_parse, raw)
+    print(f"{'legacy regex+json':<24} {base_time * 1000:>9.2f} {base_peak / 1024:>9.0f}")
+    for last in (20, 1000):
+        cost, peak = measure(lambda r: tail_parse(r, last), raw)
+        label = f'tail last={last}'
+        print(f"{label:<24} {cost * 1000:>9.2f} {peak / 1024:>9.0f}   {base_time / cost:.0f}x cpu, {base_peak / max(peak, 1):.0f}x mem")
+
+
+if __name__ == '__main__':
+    if '--make-fixture' in sys.argv[1:]:
+        make_fixture()
+    else:
+        run()
@@ -0,0 +1,79 @@
+""" 本地 OpenAI 兼容接口替身，用于离线测试 news_ai_explain 的缓存和流式输出
+
+只实现 POST /v1/chat/completions（普通和 stream=True 两种），返回固定的总结内容。
+
+用法:
+    python -m bench.openai_stub --port 8901 --chunk-delay 0.05
+    # .env 中设置 OPENAI_BASE_URL=http://127.0.0.1:8901/v1 OPENAI_API_KEY=x OPENAI_MODEL_ID=stub
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+REPLY = '## 宏观\n\n- 测试总结：央行公开市场操作，流动性保持合理充裕。\n\n## 行业\n\n- 测试总结：新能源板块消息面偏暖。\n'
+
+
+def completion_body(request: dict, content: str) -> dict:
+    prompt_tokens = sum(len(m.get('content', '')) for m in request.get('messages', []))
+    return {
+        'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': int(time.time()), 'model': request.get('model', 'stub'),
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        'usage': {'completion_tokens': len(content), 'prompt_tokens': prompt_tokens, 'total_tokens': len(content) + prompt_tokens},
+    }
+
+
+class Handler(BaseHTTPRequestHandler):
+    chunk_delay = 0.0
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        body = completion_body(request, REPLY)
+        if not request.get('stream'):
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        base = {k: body[k] for k in ('id', 'created', 'model')}
+        for i in range(0, len(REPLY), 8):
+            chunk = dict(base, object='chat.completion.chunk',
+                         choices=[{'index': 0, 'delta': {'content': REPLY[i:i + 8]}, 'finish_reason': None}])
+            self.wfile.write(f'data: {json.dumps(chunk, ensure_ascii=False)}\n\n'.encode('utf-8'))
+            self.wfile.flush()
+            time.sleep(self.chunk_delay)
+        if (request.get('stream_options') or {}).get('include_usage'):
+            chunk = dict(base, object='chat.completion.chunk', choices=[], usage=body['usage'])
+            self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int = 8901, chunk_delay: float = 0.0) -> ThreadingHTTPServer:
+    Handler.chunk_delay = chunk_delay
+    return ThreadingHTTPServer(('127.0.0.1', port), Handler)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8901)
+    parser.add_argument('--chunk-delay', type=float, default=0.0)
+    args = parser.parse_args()
+    server = serve(args.port, args.chunk_delay)
+    print(f'OpenAI stub listening on http://127.0.0.1:{args.port}/v1')
+    server.serve_forever()
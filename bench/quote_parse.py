@@ -0,0 +1,68 @@
+""" 腾讯行情解析基准：原 get_realtime_rates 的整体解码+split 解析 vs finance.quote 的字节扫描解析
+
+用法:
+    python -m bench.quote_parse            # 默认 1/10/100/1000 个代码
+    python -m bench.quote_parse 500 2000
+"""
+import sys
+import timeit
+
+from finance.quote import parse_quotes, parse_quote_table
+
+
+def make_record(i: int) -> bytes:
+    """ 按真实响应的字段数(88)和格式构造一条记录 """
+    code = f'{204001 + i:06d}'
+    price = f'{1.5 + i % 100 / 100:.3f}'
+    fields = ['1', f'GC{i:03d}', code, price, '1.520', '1.530', '123456', '60000', '63456']
+    fields += [f'{float(price) + k / 1000:.3f}~{100 * k}' for k in range(10)]  # 五档买卖
+    fields += ['', '20261016150003', '0.010', '0.66', '1.600', '1.450', f'{price}/123456/1236000000',
+               '123456', '123600', '0.12', '', '', '0.66', '1.600', '1.450', '0.10', '1650.00', '1650.00',
+               '0.00', '1.672', '1.368', '1.02', '-1', price]
+    fields += [''] * (88 - len('~'.join(fields).split('~')))
+    return f'v_sh{code}="{"~".join(fields)}";\n'.encode('gbk')
+
+
+def make_payload(n: int) -> bytes:
+    return b''.join(make_record(i) for i in range(n))
+
+
+def legacy_parse(content: bytes):
+    """ 原 RepoMonitor.get_realtime_rates 的解析逻辑 """
+    text_content = content.decode('gbk')
+    data = {}
+    lines = text_content.strip().split(";")
+    for line in lines:
+        line = line.strip()
+        if not line: continue
+        if "=" not in line: continue
+        parts = line.split('=')
+        code_key = parts[0].split('_')[-1]
+        content_str = parts[1].replace('"', '')
+        values = content_str.split('~')
+        if len(values) > 10:
+            name = values[1]
+            try:
+                rate = float(values[3])
+                if rate > 0:
+                    data[code_key] = {"name": name, "rate": rate}
+            except ValueError:
+                continue
+    return data
+
+
+def run(sizes=(1, 10, 100, 1000)):
+    print(f"{'symbols':>8} {'legacy(us)':>12} {'parse_quotes(us)':>18} {'table(us)':>10} {'speedup':>8}")
+    for n in sizes:
+        payload = make_payload(n)
+        assert len(parse_quotes(payload)) == len(legacy_parse(payload)) == n
+        number = max(1, 20000 // n)
+        results = []
+        for func in (legacy_parse, parse_quotes, parse_quote_table):
+            best = min(timeit.repeat(lambda: func(payload), number=number, repeat=5))
+            results.append(best / number * 1e6)
+        print(f'{n:>8} {results[0]:>12.1f} {results[1]:>18.1f} {results[2]:>10.1f} {results[0] / results[1]:>7.2f}x')
+
+
+if __name__ == '__main__':
+    run([int(x) for x in sys.argv[1:]] or (1, 10, 100, 1000))
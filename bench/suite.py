@@ -0,0 +1,220 @@
+""" 解析热点的离线基准：每个解析函数跑 bench/fixtures 里的响应，报告吞吐和 tracemalloc 峰值
+
+| 用例        | 解析函数                                   | fixture                                   |
+| quote       | finance.quote.parse_quotes                 | quote_{1,100,1000}.txt.gz（腾讯行情，GBK） |
+| news        | news_ai_explain.parse_news_page            | news_page.js.gz（东财7x24快讯，100条/页）  |
+| nav_trend   | nav_store.parse_pingzhong                  | pingzhongdata_511880.js.gz（约13年净值）   |
+| kjtl_aes    | stock_index_summary.new_my_decode          | kjtl_plain.json（运行前按接口的方式加密）  |
+| jisilu      | lof_discount.to_columns + select_lofs      | jisilu_lof.json.gz（集思录 index_lof_list）|
+
+fixture 按各接口的真实格式和体量生成（固定随机种子，可重复），已经提交在仓库里；
+缺失时自动生成，--make-fixtures 重新生成全部。
+
+用法:
+    python -m bench                  # 全部用例
+    python -m bench quote news       # 只跑名字以这些开头的用例
+    python -m bench --json           # 每个用例输出一行 JSON，方便保存对比
+    python -m bench --make-fixtures
+"""
+import argparse
+import base64
+import gzip
+import json
+import random
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, List
+
+from bench import nav_trend, quote_parse
+
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+QUOTE_SIZES = (1, 100, 1000)
+NEWS_PAGE = 'news_page.js.gz'
+KJTL_PLAIN = 'kjtl_plain.json'
+JISILU_LOF = 'jisilu_lof.json.gz'
+KJTL_KEY = b'bieyanjiulexixishuibatoufameill1'[:32]  # 与 new_my_decode 相同
+KJTL_IV = b'nengnongchulainbl1'[:16]
+
+
+@dataclass
+class Case:
+    name: str
+    func: Callable[[Any], Any]
+    payload: Any
+    size: int    # 输入字节数
+    items: int   # 输入的记录数（行情代码、快讯、净值点、数据行）
+
+
+@dataclass
+class Result:
+    name: str
+    items: int
+    size: int
+    seconds: float   # 单次耗时
+    peak: int        # tracemalloc 峰值（字节）
+
+    def as_dict(self) -> dict:
+        return {'case': self.name, 'items': self.items, 'bytes': self.size, 'us': round(self.seconds * 1e6, 2),
+                'items_per_s': round(self.items / self.seconds), 'mb_per_s': round(self.size / self.seconds / 2**20, 2),
+                'peak_kb': round(self.peak / 1024, 1)}
+
+
+def _write_gz(path: Path, text: str, encoding: str = 'utf-8'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(gzip.compress(text.encode(encoding), mtime=0))
+    print(f'{path}: {len(text.encode(encoding)) / 1024:.0f}KB')
+
+
+def make_quote_fixtures():
+    for n in QUOTE_SIZES:
+        _write_gz(FIXTURES / f'quote_{n}.txt.gz', quote_parse.make_payload(n).decode('gbk'), 'gbk')
+
+
+def make_news_fixture():
+    rng = random.Random(102)
+    topics = ['央行', '国务院', '证监会', '美联储', '商务部', '发改委', '财政部', '统计局', '工信部', '外汇局']
+    events = ['开展逆回购操作', '发布数据', '召开新闻发布会', '出台稳增长措施', '公布最新利率决议', '答记者问']
+    showtime = datetime(2026, 10, 16, 15, 0, 0)
+    lives = []
+    for i in range(100):
+        showtime -= timedelta(seconds=rng.randint(20, 240))
+        news_id = f'202610163{rng.randint(0, 9)}{4000000 - i:07d}'
+        title = f'{rng.choice(topics)}：{rng.choice(events)}'
+        digest = f'【{title}】财联社/东方财富讯，' + '，'.join(rng.choice(events) + rng.choice(topics) for _ in range(rng.randint(4, 20))) + '。'
+        lives.append({
+            'id': news_id, 'newsid': news_id, 'url_w': f'http://finance.eastmoney.com/a/{news_id}.html',
+            'url_m': f'http://wap.eastmoney.com/a/{news_id}.html', 'url_unique': f'https://finance.eastmoney.com/a/{news_id}.html',
+            'title': title, 'simtitle': title, 'digest': digest, 'simdigest': digest, 'titlestyle': '0', 'titlecolor': '',
+            'showtime': showtime.strftime('%Y-%m-%d %H:%M:%S'), 'ordertime': showtime.strftime('%Y-%m-%d %H:%M:%S'),
+            'pinglun_Num': rng.randint(0, 50), 'share': rng.randint(0, 20), 'commentCount': 0, 'newstype': 1,
+            'column': '102,' + str(rng.randint(103, 120)), 'image': [], 'stocklist': [],
+        })
+    body = json.dumps({'rc': 1, 'me': '', 'LivesList': lives}, ensure_ascii=False, separators=(',', ':'))
+    _write_gz(FIXTURES / NEWS_PAGE, f'var ajaxResult={body}')
+
+
+def make_kjtl_fixture():
+    """ 恐惧贪婪指数接口解密后的明文：近几年每个交易日一个点 """
+    rng = random.Random(1697623588)
+    start, dates, values, value = datetime(2019, 1, 2), [], [], 50.0
+    for i in range(365 * 7):
+        day = start + timedelta(days=i)
+        if day.weekday() < 5:
+            value = min(100.0, max(0.0, value + rng.gauss(0, 3)))
+            dates.append(day.strftime('%Y-%m-%d'))
+            values.append(round(value, 2))
+    plain = {'code': 0, 'msg': 'success', 'data': {
+        'title': '恐贪指数', 'xAxis': dates,
+        'series': [{'name': '恐贪指数', 'data': values}, {'name': '上证指数', 'data': [round(3000 + v * 5, 2) for v in values]}],
+    }}
+    path = FIXTURES / KJTL_PLAIN
+    path.write_text(json.dumps(plain, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+    print(f'{path}: {path.stat().st_size / 1024:.0f}KB')
+
+
+def make_jisilu_fixture(n: int = 420):
+    rng = random.Random(20261016)
+    statuses = ['开放申购'] * 6 + ['暂停申购', '限大额']
+    rows = []
+    for i in range(n):
+        fund_id = f'{rng.choice(["16", "50", "16", "15"])}{i:04d}'
+        rt = rng.choice(['', '-']) if rng.random() < 0.05 else f'{rng.gauss(0.5, 3):.2f}'
+        rows.append({'id': fund_id, 'cell': {
+            'fund_id': fund_id, 'fund_nm': f'指数LOF{i:03d}', 'price': f'{rng.uniform(0.5, 3):.3f}',
+            'increase_rt': f'{rng.gauss(0, 1.5):.2f}', 'volume': f'{rng.uniform(0, 5000):.2f}', 'amount': str(rng.randint(0, 90000)),
+            'fund_nav': f'{rng.uniform(0.5, 3):.4f}', 'nav_dt': '2026-10-15', 'estimate_value': f'{rng.uniform(0.5, 3):.4f}',
+            'discount_rt': rt, 'index_id': f'{rng.randint(0, 999999):06d}', 'index_nm': '中证指数',
+            'index_increase_rt': f'{rng.gauss(0, 1.5):.2f}', 'apply_fee': '1.20%', 'apply_status': rng.choice(statuses),
+            'redeem_fee': '0.50%', 'redeem_status': '开放赎回', 'min_amt': '10', 'issuer_nm': '某某基金', 'urls': '',
+        }})
+    _write_gz(FIXTURES / JISILU_LOF, json.dumps({'page': 1, 'rows': rows, 'total': n}, ensure_ascii=False, separators=(',', ':')))
+
+
+def make_fixtures():
+    make_quote_fixtures()
+    make_news_fixture()
+    nav_trend.make_fixture()
+    make_kjtl_fixture()
+    make_jisilu_fixture()
+
+
+def _read(name: str) -> bytes:
+    path = FIXTURES / name
+    if not path.exists():
+        make_fixtures()
+    raw = path.read_bytes()
+    return gzip.decompress(raw) if name.endswith('.gz') else raw
+
+
+def encrypt_kjtl(plain: bytes) -> str:
+    """ 按 new_my_decode 的方式加密，得到接口返回的 base64 字符串 """
+    from Crypto.Cipher import AES
+    from Crypto.Util.Padding import pad
+    return base64.b64encode(AES.new(KJTL_KEY, AES.MODE_CBC, KJTL_IV).encrypt(pad(plain, AES.block_size))).decode()
+
+
+def build_cases() -> List[Case]:
+    from finance.lof_discount import select_lofs, to_columns
+    from finance.nav_store import parse_pingzhong
+    from finance.news_ai_explain import parse_news_page
+    from finance.quote import parse_quotes
+    from finance.stock_index_summary import new_my_decode
+
+    cases = []
+    for n in QUOTE_SIZES:
+        raw = _read(f'quote_{n}.txt.gz')
+        cases.append(Case(f'quote/{n}', parse_quotes, raw, len(raw), n))
+
+    text = _read(NEWS_PAGE).decode('utf-8')
+    cases.append(Case('news/page', parse_news_page, text, len(text.encode('utf-8')), len(parse_news_page(text))))
+
+    raw = _read(nav_trend.FIXTURE.name)
+    total = len(parse_pingzhong(raw)['points'])
+    cases.append(Case('nav_trend/last20', lambda r: parse_pingzhong(r, 20), raw, len(raw), 20))
+    cases.append(Case('nav_trend/all', parse_pingzhong, raw, len(raw), total))
+
+    encrypted = encrypt_kjtl(_read(KJTL_PLAIN))
+    points = len(json.loads(new_my_decode(encrypted))['data']['xAxis'])
+    cases.append(Case('kjtl_aes/decode', lambda e: json.loads(new_my_decode(e)), encrypted, len(encrypted), points))
+
+    raw = _read(JISILU_LOF)
+    rows = len(json.loads(raw)['rows'])
+    cases.append(Case('jisilu/select', lambda r: select_lofs(to_columns(json.loads(r)['rows'])), raw, len(raw), rows))
+    return cases
+
+
+def measure(case: Case) -> Result:
+    timer = timeit.Timer(lambda: case.func(case.payload))
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=5, number=number)) / number
+    tracemalloc.start()
+    case.func(case.payload)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return Result(case.name, case.items, case.size, best, peak)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='解析热点离线基准')
+    parser.add_argument('cases', nargs='*', help='只跑名字以这些开头的用例')
+    parser.add_argument('--json', action='store_true', help='每个用例输出一行 JSON')
+    parser.add_argument('--make-fixtures', action='store_true', help='重新生成 bench/fixtures')
+    args = parser.parse_args(argv)
+    if args.make_fixtures:
+        make_fixtures()
+        return
+
+    cases = [c for c in build_cases() if not args.cases or any(c.name.startswith(p) for p in args.cases)]
+    if not args.json:
+        print(f"{'case':<18} {'items':>6} {'KB':>7} {'us/op':>10} {'items/s':>11} {'MB/s':>8} {'peak(KB)':>9}")
+    for case in cases:
+        r = measure(case).as_dict()
+        if args.json:
+            print(json.dumps(r, ensure_ascii=False))
+        else:
+            print(f"{r['case']:<18} {r['items']:>6} {r['bytes'] / 1024:>7.0f} {r['us']:>10.1f} "
+                  f"{r['items_per_s']:>11,} {r['mb_per_s']:>8.1f} {r['peak_kb']:>9.1f}")
@@ -0,0 +1,127 @@
+""" 共用的 HTTP 客户端：按 host 复用连接池，统一默认超时和 User-Agent，可缓存的资源带条件请求
+
+原来各模块直接 requests.get/post，每次新建连接、各自抄一份 User-Agent，有的请求没有超时。
+这里：
+- 每个 host 一个 Session（keep-alive 连接池），常驻进程里同一 host 的请求复用连接
+- 没有指定 timeout 时使用 DEFAULT_TIMEOUT（连接, 读取），不会卡在没有响应的连接上
+- get_cached() 把响应体和 ETag/Last-Modified 存到 data/http_cache/，下次带 If-None-Match/If-Modified-Since，
+  上游返回 304 时用本地副本，响应对象的 not_modified 为 True
+
+requests 在导入本模块时才导入，任务里应在用到的函数中 `from common import http`。
+
+用法:
+    from common import http
+    resp = http.get(url, params=params, headers={'Referer': ...})
+    resp = http.get_cached(url)       # resp.not_modified 表示内容和上次相同
+    except http.RequestException: ...
+"""
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests import RequestException
+from requests.adapters import HTTPAdapter
+
+from common import metrics, upstream
+
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / 'data' / 'http_cache'
+DEFAULT_TIMEOUT = (3.05, 10)  # (连接, 读取) 秒
+POOL_SIZE = 10                # 每个 host 的连接池大小（news_ai_explain 并发翻页最多 9 个）
+CACHE_ENTRIES = 64            # 本地缓存最多保留的资源数，超出时删除最久未更新的
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36',
+    'Accept': '*/*',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+}
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def session(url: str) -> requests.Session:
+    """ url 所在 host 的共享 Session """
+    host = urlsplit(url).netloc
+    with _lock:
+        if host not in _sessions:
+            s = requests.Session()
+            s.headers.update(DEFAULT_HEADERS)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            s.mount('https://', adapter)
+            s.mount('http://', adapter)
+            _sessions[host] = s
+        return _sessions[host]
+
+
+def request(method: str, url: str, timeout=None, **kwargs) -> requests.Response:
+    """ 耗时按上游 host 记入 metrics 的 http_request_seconds """
+    host, status = upstream.host(url), 'error'
+    started = time.perf_counter()
+    try:
+        response = session(url).request(method, url, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+        status = response.status_code
+        return response
+    finally:
+        metrics.observe('http_request_seconds', time.perf_counter() - started, host=host, method=method)
+        metrics.inc('http_requests_total', host=host, status=status)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request('GET', url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request('POST', url, **kwargs)
+
+
+def _cache_paths(url: str, params: Optional[dict]):
+    key = hashlib.sha1(json.dumps([url, sorted((params or {}).items())], default=str).encode()).hexdigest()
+    return CACHE_DIR / f'{key}.json', CACHE_DIR / f'{key}.body'
+
+
+def _prune_cache():
+    metas = sorted(CACHE_DIR.glob('*.json'), key=lambda p: p.stat().st_mtime)
+    for meta in metas[:max(0, len(metas) - CACHE_ENTRIES)]:
+        meta.unlink(missing_ok=True)
+        meta.with_suffix('.body').unlink(missing_ok=True)
+
+
+def get_cached(url: str, params: Optional[dict] = None, headers: Optional[dict] = None, **kwargs) -> requests.Response:
+    """
+    带 ETag/Last-Modified 的 GET：有本地副本时发条件请求，304 时把本地副本填回响应（状态码改为 200）
+    返回的响应多一个 not_modified 属性；非 2xx 响应不缓存，由调用方 raise_for_status()
+    """
+    meta_path, body_path = _cache_paths(url, params)
+    meta = {}
+    if meta_path.exists() and body_path.exists():
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        except ValueError:
+            meta = {}
+    headers = dict(headers or {})
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    response = get(url, params=params, headers=headers, **kwargs)
+    response.not_modified = False
+    if response.status_code == 304 and meta:
+        response.status_code = 200
+        response._content = body_path.read_bytes()
+        response.encoding = meta.get('encoding')
+        response.not_modified = True
+        return response
+    etag, last_modified = response.headers.get('ETag', ''), response.headers.get('Last-Modified', '')
+    if response.ok and (etag or last_modified):
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        body_path.write_bytes(response.content)
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified, 'encoding': response.encoding, 'fetched': time.time()}
+        meta_path.write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+        _prune_cache()
+    return response
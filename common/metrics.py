@@ -0,0 +1,171 @@
+""" 进程内指标：阶段计时、计数，导出为 Prometheus textfile（node_exporter 的 textfile collector 读取）
+
+原来只有 tee 到 logs/*.log 的 print，看不出一次 qt.gtimg.cn 请求、净值预估、LLM 调用各花了多久，
+也看不出从触发阈值到飞书送达隔了多久。这里各热点路径记录：
+- reminder_http_request_seconds{host,method}   各上游的请求耗时（common.http）
+- reminder_http_requests_total{host,status}     请求数，异常记为 status="error"
+- reminder_parse_seconds{parser}                 响应解析耗时（行情、快讯、净值、集思录、恐贪指数）
+- reminder_stage_seconds{stage}                  其他阶段：estimate（净值预估）、tick（一轮盯盘）、llm
+- reminder_llm_first_token_seconds / reminder_llm_tokens_total{kind} / reminder_llm_tokens_per_second
+- reminder_notify_send_seconds{channel,result}   单次通知各渠道的发送耗时
+- reminder_alert_delivery_seconds{kind}          告警写入发件箱到送达的耗时（含合并窗口）
+- reminder_job_seconds{module}                   调度进程里每个任务的运行耗时
+
+每个进程一个文件 <METRICS_DIR>/<进程名>.prom（进程名取 sys.argv[0]，如 lof_discount、tick_engine、scheduler），
+所有指标带 job=<进程名> 标签。进程退出时写入；常驻进程由 TickEngine / scheduler 调用 maybe_flush() / flush()。
+METRICS_DIR 取环境变量或 .env，默认 data/metrics；没有记录任何指标的进程（如不在播报时间直接退出）不写文件。
+
+用法:
+    from common import metrics
+    with metrics.timer('parse_seconds', parser='quote'):
+        ...
+    metrics.observe('alert_delivery_seconds', 12.3, kind='fund')
+    metrics.inc('llm_tokens_total', 1024, kind='completion')
+"""
+import atexit
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+PREFIX = 'reminder_'
+DEFAULT_DIR = Path(__file__).resolve().parent.parent / 'data' / 'metrics'
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)  # 秒
+FLUSH_INTERVAL = 15  # maybe_flush 的最短间隔(秒)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self, job: str):
+        self.job = job
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.flushed = 0.0
+
+    def __bool__(self):
+        return bool(self.counters or self.gauges or self.histograms)
+
+    @staticmethod
+    def _labels(labels: Dict[str, object]) -> Labels:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._labels(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self.lock:
+            self.gauges.setdefault(name, {})[self._labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._labels(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    def _format_labels(self, labels: Labels, extra: List[Tuple[str, str]] = ()) -> str:
+        pairs = [('job', self.job), *labels, *extra]
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+        return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+    def render(self) -> str:
+        """ Prometheus 文本格式 """
+        lines = []
+        with self.lock:
+            for kind, metrics in (('counter', self.counters), ('gauge', self.gauges)):
+                for name, series in sorted(metrics.items()):
+                    lines.append(f'# TYPE {PREFIX}{name} {kind}')
+                    lines += [f'{PREFIX}{name}{self._format_labels(labels)} {value:.15g}' for labels, value in series.items()]
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f'# TYPE {PREFIX}{name} histogram')
+                for labels, hist in series.items():
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS, hist.counts):
+                        cumulative += count
+                        lines.append(f'{PREFIX}{name}_bucket{self._format_labels(labels, [("le", f"{bound:g}")])} {cumulative}')
+                    lines.append(f'{PREFIX}{name}_bucket{self._format_labels(labels, [("le", "+Inf")])} {hist.count}')
+                    lines.append(f'{PREFIX}{name}_sum{self._format_labels(labels)} {hist.sum:.6f}')
+                    lines.append(f'{PREFIX}{name}_count{self._format_labels(labels)} {hist.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _process_name() -> str:
+    return Path(sys.argv[0]).stem if sys.argv and sys.argv[0] not in ('', '-c') else 'python'
+
+
+REGISTRY = Registry(_process_name())
+inc, set_gauge, observe = REGISTRY.inc, REGISTRY.set, REGISTRY.observe
+
+
+@contextmanager
+def timer(name: str, **labels):
+    """ 记录 with 块的耗时(秒)到直方图 name """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(name, time.perf_counter() - started, **labels)
+
+
+def metrics_dir() -> Path:
+    configured = os.environ.get('METRICS_DIR')
+    if not configured:
+        from dotenv import dotenv_values
+        configured = dotenv_values().get('METRICS_DIR')
+    return Path(configured) if configured else DEFAULT_DIR
+
+
+def flush():
+    """ 原子写入 <METRICS_DIR>/<进程名>.prom，避免 node_exporter 读到一半的文件 """
+    if not REGISTRY:
+        return
+    REGISTRY.set('last_flush_timestamp_seconds', time.time())
+    directory = metrics_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{REGISTRY.job}.prom'
+    tmp = path.with_suffix(f'.prom.{os.getpid()}.tmp')
+    tmp.write_text(REGISTRY.render(), encoding='utf-8')
+    tmp.replace(path)
+    REGISTRY.flushed = time.monotonic()
+
+
+def maybe_flush(interval: float = FLUSH_INTERVAL):
+    """ 常驻进程的循环里调用，距上次写入超过 interval 秒才写 """
+    if time.monotonic() - REGISTRY.flushed >= interval:
+        flush()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception as e:
+        print(f'[指标] 写入失败: {e}')
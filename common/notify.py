@@ -0,0 +1,158 @@
+""" 通知分发：并发发送到 pyutils.notify_util 的各个渠道
+
+原来各脚本是 Feishu -> finally Pushme -> Bark 串行阻塞发送，飞书慢了会拖住紧急的 Bark。
+这里每个渠道独立线程发送，带有限重试和耗时统计；渠道实例按 token 缓存复用。
+单次超时作为 timeout 参数传给渠道方法自己的 HTTP 请求（MockChannel 和带 timeout 参数的 pyutils 渠道），
+请求超时即抛出异常结束，再由同一线程重试，不会有两次发送同时进行；
+pyutils 渠道方法没有 timeout 参数时使用它自己的请求超时。
+
+用法:
+    notifier = get_notifier(cfg)
+    notifier.send_markdown(title, content, cate='套利', icon='😀', channels=('feishu', 'pushme', 'bark'))
+    notifier.send_markdown(title, content, wait=False)   # 盯盘循环里不等待发送结果
+
+设置 MOCK_UPSTREAM 时各渠道换成 MockChannel，消息 POST 到本地替身服务(bench.mock_server)而不是真实推送。
+"""
+import contextvars
+import functools
+import inspect
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from dotenv import dotenv_values
+
+from common import metrics, upstream
+
+
+CHANNEL_TIMEOUT = 10  # 单次发送的 HTTP 超时(秒)
+RETRIES = 2           # 失败后最多重试次数
+RETRY_BACKOFF = 1.0   # 重试间隔(秒)，按次数递增
+DEFAULT_CHANNELS = ('feishu', 'pushme')
+TOKEN_KEYS = {'feishu': 'FEISHU_WEBHOOK_TOKEN', 'pushme': 'PUSHME_PUSH_KEY', 'bark': 'BARK_TOKEN'}
+
+
+class MockChannel:
+    """ 替身渠道：任意方法调用都 POST 到 {MOCK_UPSTREAM}/notify/{渠道}/{方法} """
+
+    def __init__(self, name: str, base: str, timeout: float = CHANNEL_TIMEOUT):
+        self.name = name
+        self.base = base
+        self.timeout = timeout
+
+    def __getattr__(self, method: str):
+        if method.startswith('_'):
+            raise AttributeError(method)
+
+        def send(*args, timeout=None, **kwargs):
+            from common import http
+            resp = http.post(f'{self.base}/notify/{self.name}/{method}', json={'args': args, 'kwargs': kwargs},
+                             timeout=timeout or self.timeout)
+            resp.raise_for_status()
+            return resp.json()
+        return send
+
+
+def with_timeout(method: Callable, timeout: float) -> Callable:
+    """ 渠道方法有 timeout 参数时把单次超时传下去，否则原样返回 """
+    try:
+        accepts = 'timeout' in inspect.signature(method).parameters
+    except (TypeError, ValueError):
+        accepts = False
+    return functools.partial(method, timeout=timeout) if accepts else method
+
+
+@dataclass
+class SendResult:
+    channel: str
+    ok: bool
+    attempts: int
+    latency: float  # 从提交到最终结果的耗时(秒)
+    error: str = ''
+
+    def __str__(self):
+        status = 'ok' if self.ok else f'失败({self.error})'
+        return f'{self.channel} {status} {self.latency:.2f}s/{self.attempts}次'
+
+
+class Notifier:
+    def __init__(self, cfg: Optional[Dict[str, str]] = None, timeout: float = CHANNEL_TIMEOUT,
+                 retries: int = RETRIES, max_workers: int = 8):
+        self.cfg = cfg if cfg is not None else dotenv_values()
+        self.timeout = timeout
+        self.retries = retries
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='notify')
+        self._channels: Dict[str, Any] = {}
+
+    def channel(self, name: str):
+        """ 渠道实例，按名称缓存复用 """
+        if name not in self._channels and upstream.mock_base():
+            self._channels[name] = MockChannel(name, upstream.mock_base(), self.timeout)
+        if name not in self._channels:
+            from pyutils.notify_util import Feishu, Pushme, Bark
+            cls = {'feishu': Feishu, 'pushme': Pushme, 'bark': Bark}[name]
+            self._channels[name] = cls(self.cfg[TOKEN_KEYS[name]])
+        return self._channels[name]
+
+    def method(self, name: str, method: str) -> Callable:
+        """ 渠道方法，调用时 HTTP 请求带单次超时 """
+        return with_timeout(getattr(self.channel(name), method), self.timeout)
+
+    def _send(self, name: str, func: Callable[[], Any]) -> SendResult:
+        started = time.monotonic()
+        error = ''
+        for attempt in range(1, self.retries + 2):
+            try:
+                func()
+                result = SendResult(name, True, attempt, time.monotonic() - started)
+                break
+            except Exception as e:  # 包括 HTTP 请求超时
+                error = str(e) or type(e).__name__
+            if attempt <= self.retries:
+                time.sleep(RETRY_BACKOFF * attempt)
+        else:
+            result = SendResult(name, False, self.retries + 1, time.monotonic() - started, error)
+        print(f'[通知] {result}')
+        metrics.observe('notify_send_seconds', result.latency, channel=name, result='ok' if result.ok else 'failed')
+        return result
+
+    def dispatch(self, sends: Dict[str, Callable[[], Any]]) -> Dict[str, Future]:
+        """ 各渠道并发发送，立即返回 {渠道: Future[SendResult]}；发送线程沿用调用方的 context（调度进程里的任务日志） """
+        return {name: self.executor.submit(contextvars.copy_context().run, self._send, name, func)
+                for name, func in sends.items()}
+
+    @staticmethod
+    def wait(futures: Dict[str, Future]) -> Dict[str, SendResult]:
+        return {name: future.result() for name, future in futures.items()}
+
+    def send_markdown(self, title: str, content: str, cate: str = '', icon: str = '😀',
+                      channels: Iterable[str] = DEFAULT_CHANNELS, footer: Optional[str] = None,
+                      wait: bool = True):
+        """
+        发送 markdown 消息；Pushme 标题加 [#分类!图标] 前缀，与原各脚本的格式一致
+        wait=False 时立即返回 {渠道: Future}，否则返回 {渠道: SendResult}
+        """
+        sends = {}
+        for name in channels:
+            if name == 'feishu':
+                kwargs = {'footer': footer} if footer else {}
+                sends[name] = lambda kwargs=kwargs: self.method('feishu', 'send_markdown')(title, content, **kwargs)
+            elif name == 'pushme':
+                sends[name] = lambda: self.method('pushme', 'send_markdown')(f'[#{cate}!{icon}]' + title, content)
+            elif name == 'bark':
+                sends[name] = lambda: self.method('bark', 'send')(content, title)
+        futures = self.dispatch(sends)
+        return futures if not wait else self.wait(futures)
+
+
+_notifiers: Dict[tuple, Notifier] = {}
+
+
+def get_notifier(cfg: Optional[Dict[str, str]] = None) -> Notifier:
+    """ 进程内按 token 组合共享 Notifier，常驻进程里各任务复用同一组渠道和线程 """
+    cfg = cfg if cfg is not None else dotenv_values()
+    key = tuple(cfg.get(k) for k in TOKEN_KEYS.values())
+    if key not in _notifiers:
+        _notifiers[key] = Notifier(cfg)
+    return _notifiers[key]
@@ -0,0 +1,201 @@
+""" 通知发件箱：告警先落盘到 SQLite，再由发送线程投递
+
+盘中行情剧烈波动时，逆回购利率每分钟创新高就会推送一次，webhook 失败则提醒直接丢失。
+改为监控只往发件箱写记录（data/outbox.db），发送线程定期取出到期记录投递：
+- 同一 key（品种）在合并窗口内只推送一次：第一条立即发，窗口内后续提醒合并成一条，
+  内容取最新值，窗口结束时再发，标题注明合并条数
+- 发送失败的渠道按指数退避重试，超过 MAX_ATTEMPTS 或过期(EXPIRE)后不再发送
+- 记录持久化，进程重启后继续投递未发出的提醒
+
+用法:
+    outbox = get_outbox()
+    outbox.put('repo:sh204001', title, content, cate='', icon='💰', channels=('feishu', 'bark'))
+    sender = OutboxSender(outbox, get_notifier(cfg)).start()
+    ...
+    sender.stop()   # 停止前会再投递一次
+"""
+import contextvars
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from dotenv import dotenv_values
+
+from common import metrics
+
+
+DB_PATH = Path(__file__).resolve().parent.parent / 'data' / 'outbox.db'
+COALESCE_WINDOW = 300  # 同一 key 的合并窗口(秒)
+DRAIN_INTERVAL = 5     # 发送线程轮询间隔(秒)
+MAX_ATTEMPTS = 6       # 最多投递次数
+RETRY_BASE = 10        # 首次重试间隔(秒)，之后翻倍
+RETRY_MAX = 600        # 重试间隔上限(秒)
+EXPIRE = 2 * 3600      # 超过该时长仍未发出的提醒不再发送(秒)
+KEEP_DAYS = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    cate TEXT NOT NULL DEFAULT '',
+    icon TEXT NOT NULL DEFAULT '',
+    channels TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending / sent / failed / expired
+    merged INTEGER NOT NULL DEFAULT 1,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    next_try REAL NOT NULL,
+    sent_at REAL,
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox (status, next_try);
+CREATE INDEX IF NOT EXISTS idx_outbox_key ON outbox (key, status);
+"""
+
+
+class Outbox:
+    def __init__(self, path: Path = DB_PATH, window: float = COALESCE_WINDOW):
+        self.window = window
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 监控线程写、发送线程读，共用一个连接并加锁
+        self.conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def put(self, key: str, title: str, content: str, cate: str = '', icon: str = '😀',
+            channels: Iterable[str] = ('feishu', 'pushme'), now: Optional[float] = None) -> int:
+        """ 写入一条提醒，返回记录 id；同 key 尚未投递过的待发记录会被合并（重试中的记录不动） """
+        now = time.time() if now is None else now
+        channels = list(channels)
+        with self.lock, self.conn:
+            pending = self.conn.execute(
+                "SELECT id, channels FROM outbox WHERE key=? AND status='pending' AND attempts=0 ORDER BY id DESC LIMIT 1", (key,)).fetchone()
+            if pending:
+                merged_channels = list(dict.fromkeys(pending['channels'].split(',') + channels))
+                self.conn.execute(
+                    "UPDATE outbox SET title=?, content=?, cate=?, icon=?, channels=?, merged=merged+1, updated=? WHERE id=?",
+                    (title, content, cate, icon, ','.join(merged_channels), now, pending['id']))
+                return pending['id']
+
+            last_sent = self.conn.execute(
+                "SELECT MAX(sent_at) FROM outbox WHERE key=?", (key,)).fetchone()[0]
+            # 窗口内刚发过：延后到窗口结束再发，期间的提醒都合并进这条
+            next_try = max(now, last_sent + self.window) if last_sent else now
+            cur = self.conn.execute(
+                "INSERT INTO outbox (key, title, content, cate, icon, channels, created, updated, next_try) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, title, content, cate, icon, ','.join(channels), now, now, next_try))
+            return cur.lastrowid
+
+    def due(self, now: Optional[float] = None) -> List[sqlite3.Row]:
+        now = time.time() if now is None else now
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE outbox SET status='expired' WHERE status='pending' AND created<?", (now - EXPIRE,))
+            return self.conn.execute(
+                "SELECT * FROM outbox WHERE status='pending' AND next_try<=? ORDER BY next_try", (now,)).fetchall()
+
+    def mark_sent(self, id_: int, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE outbox SET status='sent', sent_at=COALESCE(sent_at, ?), attempts=attempts+1, error='' WHERE id=?", (now, id_))
+
+    def mark_failed(self, id_: int, channels: List[str], error: str, partial: bool = False, now: Optional[float] = None):
+        """ 只保留失败的渠道，按指数退避安排下次重试；partial 表示部分渠道已送达，同样计入合并窗口 """
+        now = time.time() if now is None else now
+        with self.lock, self.conn:
+            attempts = self.conn.execute("SELECT attempts FROM outbox WHERE id=?", (id_,)).fetchone()[0] + 1
+            status = 'failed' if attempts >= MAX_ATTEMPTS else 'pending'
+            next_try = now + min(RETRY_MAX, RETRY_BASE * 2 ** (attempts - 1))
+            self.conn.execute(
+                "UPDATE outbox SET status=?, attempts=?, channels=?, next_try=?, error=?, "
+                "sent_at=COALESCE(sent_at, CASE WHEN ? THEN ? END) WHERE id=?",
+                (status, attempts, ','.join(channels), next_try, error, partial, now, id_))
+
+    def drain(self, notifier, now: Optional[float] = None) -> int:
+        """ 投递所有到期记录，返回成功条数 """
+        sent = 0
+        for row in self.due(now):
+            title, content = row['title'], row['content']
+            if row['merged'] > 1:
+                title = f"{title}（合并{row['merged']}条）"
+                content = f"{content}\n\n- {int(self.window)}秒内共 {row['merged']} 条提醒，以上为最新值"
+            results = notifier.send_markdown(title, content, cate=row['cate'], icon=row['icon'],
+                                             channels=row['channels'].split(','))
+            delivered = time.time() if now is None else now
+            kind = row['key'].split(':', 1)[0]
+            for name, result in results.items():
+                if result.ok:  # 从第一条告警写入发件箱到该渠道送达，含合并窗口和重试
+                    metrics.observe('alert_delivery_seconds', delivered - row['created'], kind=kind, channel=name)
+            failed = [name for name, result in results.items() if not result.ok]
+            if failed:
+                error = '; '.join(f'{name}: {results[name].error}' for name in failed)
+                self.mark_failed(row['id'], failed, error, partial=len(failed) < len(results), now=now)
+            else:
+                self.mark_sent(row['id'], now=now)
+                sent += 1
+        return sent
+
+    def prune(self, keep_days: int = KEEP_DAYS):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM outbox WHERE status!='pending' AND updated<?", (time.time() - keep_days * 86400,))
+
+    def pending_count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM outbox WHERE status='pending'").fetchone()[0]
+
+
+class OutboxSender(threading.Thread):
+    """ 后台投递线程 """
+
+    def __init__(self, outbox: Outbox, notifier, interval: float = DRAIN_INTERVAL):
+        super().__init__(name='outbox-sender', daemon=True)
+        self.outbox = outbox
+        self.notifier = notifier
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.context = contextvars.copy_context()  # 沿用创建者的 context（调度进程里的任务日志）
+
+    def run(self):
+        self.context.run(self._run)
+
+    def _run(self):
+        self.outbox.prune()
+        while not self.stopped.is_set():
+            self._drain()
+            self.stopped.wait(self.interval)
+        self._drain()
+
+    def _drain(self):
+        try:
+            self.outbox.drain(self.notifier)
+        except Exception as e:
+            print(f'[发件箱] 投递出错: {e}')
+
+    def start(self) -> 'OutboxSender':
+        super().start()
+        return self
+
+    def stop(self, timeout: float = 30):
+        """ 停止并等待最后一次投递完成 """
+        self.stopped.set()
+        self.join(timeout)
+
+
+_outbox: Optional[Outbox] = None
+
+
+def get_outbox() -> Outbox:
+    """ 进程内共享的发件箱；合并窗口可用 .env 的 ALERT_COALESCE_WINDOW 配置 """
+    global _outbox
+    if _outbox is None:
+        window = dotenv_values().get('ALERT_COALESCE_WINDOW')
+        _outbox = Outbox(window=float(window) if window else COALESCE_WINDOW)
+    return _outbox
@@ -0,0 +1,31 @@
+""" 上游接口地址：设置环境变量 MOCK_UPSTREAM 时改写到本地替身服务(bench.mock_server)
+
+    MOCK_UPSTREAM=http://127.0.0.1:8900 python -m finance.lof_discount
+    # https://www.jisilu.cn/data/lof/index_lof_list/ -> http://127.0.0.1:8900/www.jisilu.cn/data/lof/index_lof_list/
+
+各模块的接口常量都用 url() 包一层，导入时读取一次环境变量；未设置时原样返回，没有额外开销。
+注意 data/ 下的缓存（节假日、净值、快讯等）照常写入，压测前可以先备份或换一个工作目录。
+"""
+import os
+from typing import Optional
+from urllib.parse import urlsplit
+
+
+def mock_base() -> Optional[str]:
+    return os.environ.get('MOCK_UPSTREAM', '').rstrip('/') or None
+
+
+def url(original: str) -> str:
+    """ https://host/path -> {MOCK_UPSTREAM}/host/path """
+    base = mock_base()
+    if not base:
+        return original
+    return f"{base}/{original.split('://', 1)[-1]}"
+
+
+def host(address: str) -> str:
+    """ 请求地址对应的上游 host；改写到替身服务的地址返回原来的 host（通知渠道为 notify） """
+    base = mock_base()
+    if base and address.startswith(base + '/'):
+        return address[len(base) + 1:].split('/', 1)[0]
+    return urlsplit(address).netloc
@@ -1,40 +1,91 @@
 # coding: utf-8
 ''' 可转债打新提醒
-@crontab: 30 09 * * * cd ${BASE_PATH} && python -m finance.convertible_bonds_ipo.py 2>&1 | tee -a logs/convertible_bonds_ipo.log
+@crontab: 30 09 * * 1-5 cd $reminder_home && $PYTHON -u -m finance.convertible_bonds_ipo 2>&1 | tee -a logs/convertible_bonds_ipo.log
+
+申购日历只取用到的3列，并在服务端按 VALUE_DATE 过滤未来 LOOKAHEAD_DAYS 天，
+结果缓存到 data/cb_calendar.json。新债一般只提前两天左右公告，每天第一次运行都重新请求，
+同一天再次运行直接读本地文件，也不用导入 common.http(requests)；请求失败时退回旧缓存。
 '''
 
 import json
 import sys
 import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List
+
 from dotenv import dotenv_values
 
-import requests
-from pyutils.notify_util import Feishu, Pushme, Bark
+from common import upstream
+from common.notify import get_notifier
 from pyutils.date_util import now
 
 
-if __name__ == '__main__':
+CB_LIST_API = upstream.url('https://datacenter-web.eastmoney.com/api/data/v1/get')
+CALENDAR_PATH = Path(__file__).resolve().parent.parent / 'data' / 'cb_calendar.json'
+COLUMNS = 'SECURITY_NAME_ABBR,SECUCODE,VALUE_DATE'
+LOOKAHEAD_DAYS = 7   # 一次取未来一周的申购日历
+TIMEOUT = 10
+
+
+def fetch_calendar(start: date, end: date) -> List[dict]:
+    """ 申购日(VALUE_DATE)在 [start, end] 内的可转债 """
+    params = {
+        'sortColumns': 'VALUE_DATE', 'sortTypes': 1, 'pageSize': 50, 'pageNumber': 1,
+        'reportName': 'RPT_BOND_CB_LIST', 'columns': COLUMNS,
+        'filter': f"(VALUE_DATE>='{start.isoformat()}')(VALUE_DATE<='{end.isoformat()}')",
+        'source': 'WEB', 'client': 'WEB',
+    }
+    from common import http
+    resp = http.get(CB_LIST_API, params=params, timeout=TIMEOUT)
+    resp.raise_for_status()
+    result = resp.json().get('result') or {}  # 范围内没有新债时 result 为 null
+    return [{k: row[k] for k in COLUMNS.split(',')} for row in result.get('data') or []]
+
+
+def load_calendar(today: date) -> List[dict]:
+    """ 读取缓存的申购日历，不是今天请求的就重新请求；请求失败时退回旧缓存 """
+    cache = {}
+    if CALENDAR_PATH.exists():
+        try:
+            cache = json.loads(CALENDAR_PATH.read_text(encoding='utf-8'))
+        except ValueError:
+            cache = {}
+    if cache.get('start') == today.isoformat():  # 今天已请求过
+        return cache['rows']
+
+    from common import http
+    end = today + timedelta(days=LOOKAHEAD_DAYS)
+    try:
+        rows = fetch_calendar(today, end)
+    except (http.RequestException, ValueError) as e:
+        print(f'获取可转债申购日历失败，使用缓存: {e}')
+        return cache.get('rows', [])
+    CALENDAR_PATH.parent.mkdir(parents=True, exist_ok=True)
+    cache = {'fetched': time.time(), 'start': today.isoformat(), 'end': end.isoformat(), 'rows': rows}
+    CALENDAR_PATH.write_text(json.dumps(cache, ensure_ascii=False), encoding='utf-8')
+    print(f'已更新可转债申购日历 {today} ~ {end}: {len(rows)}只')
+    return rows
+
+
+def main(argv=None):
     cfg = dotenv_values()
     print(f'\n\n\n=============== {now()} ===============')
 
-    resp = requests.get('https://datacenter-web.eastmoney.com/api/data/v1/get?sortColumns=PUBLIC_START_DATE&sortTypes=-1&pageSize=50&pageNumber=1&reportName=RPT_BOND_CB_LIST&columns=ALL&quoteColumns=f2~01~CONVERT_STOCK_CODE~CONVERT_STOCK_PRICE,f235~10~SECURITY_CODE~TRANSFER_PRICE,f236~10~SECURITY_CODE~TRANSFER_VALUE,f2~10~SECURITY_CODE~CURRENT_BOND_PRICE,f237~10~SECURITY_CODE~TRANSFER_PREMIUM_RATIO,f239~10~SECURITY_CODE~RESALE_TRIG_PRICE,f240~10~SECURITY_CODE~REDEEM_TRIG_PRICE,f23~01~CONVERT_STOCK_CODE~PBV_RATIO&source=WEB&client=WEB')
-    data = json.loads(resp.text)# ; print("data =", data)
-
+    today = date.fromisoformat(now('%Y-%m-%d'))
     msg = ''
-    for row in data['result']['data']:
-        if row['VALUE_DATE'].split()[0] == time.strftime("%Y-%m-%d"):
+    for row in load_calendar(today):
+        if row['VALUE_DATE'].split()[0] == today.isoformat():
             msg += "- " + " ".join((row['SECURITY_NAME_ABBR'], row['SECUCODE'], row['VALUE_DATE'].split()[0]))
             msg += "\n"
 
     if msg:
-        card_msg = {'title': f"可转债打新({time.strftime('%Y-%m-%d')})", 'msg': msg}
+        card_msg = {'title': f"可转债打新({today.isoformat()})", 'msg': msg}
         print(f'\n\n\n有可转债打新：{card_msg}\n\n\n')
 
-        try:
-            feishu = Feishu(cfg['FEISHU_WEBHOOK_TOKEN'])
-            feishu.send_markdown(card_msg['title'], card_msg['msg'])
-        finally:
-            pushme = Pushme(cfg['PUSHME_PUSH_KEY'])
-            pushme.send_markdown('[#打新!🎲📈]'+card_msg['title'], card_msg['msg'])
+        get_notifier(cfg).send_markdown(card_msg['title'], card_msg['msg'], cate='打新', icon='🎲📈',
+                                        channels=('feishu', 'pushme', 'bark'))
+
 
-            Bark(cfg['BARK_TOKEN']).send(card_msg['msg'], card_msg['title'])
+if __name__ == '__main__':
+    main()
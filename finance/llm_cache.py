@@ -0,0 +1,45 @@
+""" 大模型结果缓存
+
+按 (模型, system prompt, 规范化后的新闻列表) 的 sha256 保存总结结果到 data/llm_cache/<hash>.json，
+崩溃后重跑、同一窗口再次运行时直接复用，不再重复付费和等待。
+"""
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import List, Optional
+
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / 'data' / 'llm_cache'
+KEEP_DAYS = 7
+
+
+def cache_key(model: str, system_prompt: str, news: List[dict]) -> str:
+    """ 新闻按 (showtime, title) 排序后序列化，保证同一批新闻顺序不同也命中同一个key """
+    normalized = sorted(news, key=lambda x: (x.get('showtime', ''), x.get('title', '')))
+    payload = json.dumps([model, system_prompt, normalized], ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load(key: str) -> Optional[dict]:
+    path = CACHE_DIR / f'{key}.json'
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except ValueError:
+        return None
+
+
+def save(key: str, content: str, usage: str):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = CACHE_DIR / f'{key}.json'
+    path.write_text(json.dumps({'content': content, 'usage': usage, 'created': time.time()}, ensure_ascii=False), encoding='utf-8')
+    prune()
+
+
+def prune(keep_days: int = KEEP_DAYS):
+    cutoff = time.time() - keep_days * 86400
+    for path in CACHE_DIR.glob('*.json'):
+        if path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
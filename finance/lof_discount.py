@@ -1,60 +1,153 @@
 """
-@crontab: 30 12 * * 1-5 cd $reminder_home && $PYTHON -u -m finance.lof_discount 2>&1 | tee -a logs/lof_discount.log
+@crontab: */10 9-14 * * 1-5 cd $reminder_home && $PYTHON -u -m finance.lof_discount diff 2>&1 | tee -a logs/lof_discount.log
+
+LOF 溢价提醒（集思录 index_lof_list）
+- 默认模式：列出所有溢价 >= PREMIUM_THRESHOLD 且没有暂停申购的LOF
+- diff 模式：data/lof_snapshot.json 保存每只基金上次提醒时的溢价作为基准，只提醒新进入、退出、
+  相对基准溢价变化 >= MOVE_THRESHOLD 的基金，基准只在提醒时更新（慢慢累积的变化也会提醒）；
+  溢价 >= PREMIUM_THRESHOLD 才算进入，跌破 PREMIUM_THRESHOLD - HYSTERESIS 才算退出，在阈值附近波动的基金不会每次都提醒；
+  请求经 common.http.get_cached 带 If-None-Match/If-Modified-Since，上游返回 304 时直接结束。每天第一次运行仍发送完整列表
+numpy 在解析时才导入，304 直接结束的运行不用付这部分导入时间
 """
+import json
 import sys
-import requests
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
 from dotenv import dotenv_values
-from pyutils.notify_util import Feishu, Pushme
+from common import metrics, upstream
+from common.notify import get_notifier
 from pyutils.date_util import now
 
+if TYPE_CHECKING:
+    import numpy as np
+
+
+LOF_URL = upstream.url('https://www.jisilu.cn/data/lof/index_lof_list/')  # ?___jsl=LST___t=1770261137994&only_owned=&rp=25
+SNAPSHOT_PATH = Path(__file__).resolve().parent.parent / 'data' / 'lof_snapshot.json'
+TIMEOUT = 10
+PREMIUM_THRESHOLD = 5.0  # 溢价率(%)
+MOVE_THRESHOLD = 1.0     # diff 模式下相对上次提醒的溢价变化超过这么多个百分点才提醒
+HYSTERESIS = 0.5         # diff 模式下溢价跌破 PREMIUM_THRESHOLD - HYSTERESIS 才算退出
 
-def main():
-    headers = {
-    'accept': 'application/json, text/javascript, */*; q=0.01',
-    'accept-language': 'zh-CN,zh;q=0.9',
-    'priority': 'u=1, i',
-    'referer': 'https://www.jisilu.cn/data/lof/',
-    'sec-ch-ua': '"Google Chrome";v="143", "Chromium";v="143", "Not A(Brand";v="24"',
-    'sec-ch-ua-mobile': '?0',
-    'sec-ch-ua-platform': '"Windows"',
-    'sec-fetch-dest': 'empty',
-    'sec-fetch-mode': 'cors',
-    'sec-fetch-site': 'same-origin',
-    'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36',
-    'x-requested-with': 'XMLHttpRequest',
+
+def fetch_lof_rows() -> Tuple[List[dict], bool]:
+    """ 返回 (rows, 是否未更新)；上游返回 304 时 rows 来自 common.http 的本地副本 """
+    headers = {  # User-Agent 等通用头由 common.http 统一设置，这里只带集思录接口需要的
+        'accept': 'application/json, text/javascript, */*; q=0.01',
+        'referer': 'https://www.jisilu.cn/data/lof/',
+        'x-requested-with': 'XMLHttpRequest',
     }
+    from common import http
+    response = http.get_cached(LOF_URL, headers=headers, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json()['rows'], response.not_modified
 
-    response = requests.get(
-        'https://www.jisilu.cn/data/lof/index_lof_list/',  # ?___jsl=LST___t=1770261137994&only_owned=&rp=25
-        headers=headers
-    )
-    lof_data = response.json()
 
-    result = []
-    for x in lof_data['rows']:
-        lof_cell = x['cell']
-        if lof_cell['discount_rt'] not in ('', '-') and float(lof_cell['discount_rt']) >= 5:
-            apply_status = lof_cell.get('apply_status', '未知')
-            if apply_status != '暂停申购':
-                result.append(f'{lof_cell["fund_id"]} {lof_cell["fund_nm"]} 实时溢价={lof_cell["discount_rt"]}% 申购状态={apply_status}')
-    return result
+def to_columns(rows: List[dict]) -> Dict[str, 'np.ndarray']:
+    """ rows 转为列存，discount_rt 为空或 '-' 的记为 NaN """
+    import numpy as np
+    cells = [x['cell'] for x in rows]
+    premium = np.array([c['discount_rt'] if c['discount_rt'] not in ('', '-', None) else 'nan' for c in cells], dtype=float)
+    return {
+        'fund_id': np.array([c['fund_id'] for c in cells], dtype=object),
+        'fund_nm': np.array([c['fund_nm'] for c in cells], dtype=object),
+        'discount_rt': premium,
+        'apply_status': np.array([c.get('apply_status', '未知') for c in cells], dtype=object),
+    }
 
 
-if __name__ == '__main__':
+def select_lofs(columns: Dict[str, 'np.ndarray'], threshold: float = PREMIUM_THRESHOLD) -> Dict[str, dict]:
+    """ 溢价 >= threshold 且没有暂停申购，返回 {fund_id: {fund_nm, discount_rt, apply_status}} """
+    import numpy as np
+    with np.errstate(invalid='ignore'):
+        mask = (columns['discount_rt'] >= threshold) & (columns['apply_status'] != '暂停申购')
+    return {
+        fund_id: {'fund_nm': nm, 'discount_rt': float(rt), 'apply_status': status}
+        for fund_id, nm, rt, status in zip(*(columns[k][mask] for k in ('fund_id', 'fund_nm', 'discount_rt', 'apply_status')))
+    }
+
+
+def format_lof(fund_id: str, lof: dict) -> str:
+    return f'{fund_id} {lof["fund_nm"]} 实时溢价={lof["discount_rt"]}% 申购状态={lof["apply_status"]}'
+
+
+def diff_lofs(baseline: Dict[str, dict], current: Dict[str, dict], threshold: float = PREMIUM_THRESHOLD,
+              move: float = MOVE_THRESHOLD) -> Tuple[List[str], Dict[str, dict]]:
+    """
+    baseline: 各基金上次提醒时的数据；current: 溢价 >= threshold - HYSTERESIS 的基金(select_lofs)
+    返回 (新进入、退出、相对基准溢价变化 >= move 个百分点的基金, 新的基准)，只有提醒到的基金更新基准
+    """
+    lines, updated = [], dict(baseline)
+    for fund_id, lof in current.items():
+        if fund_id not in baseline:
+            if lof['discount_rt'] >= threshold:
+                lines.append(f'新进入 {format_lof(fund_id, lof)}')
+                updated[fund_id] = lof
+        elif abs(lof['discount_rt'] - baseline[fund_id]['discount_rt']) >= move:
+            lines.append(f'变化 {format_lof(fund_id, lof)} (上次提醒 {baseline[fund_id]["discount_rt"]}%)')
+            updated[fund_id] = lof
+    for fund_id, lof in baseline.items():
+        if fund_id not in current:
+            lines.append(f'退出 {fund_id} {lof["fund_nm"]} (上次提醒溢价 {lof["discount_rt"]}%)')
+            del updated[fund_id]
+    return lines, updated
+
+
+def load_snapshot() -> dict:
+    try:
+        return json.loads(SNAPSHOT_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_snapshot(snapshot: dict):
+    SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = SNAPSHOT_PATH.with_suffix('.tmp')
+    tmp.write_text(json.dumps(snapshot, ensure_ascii=False), encoding='utf-8')
+    tmp.replace(SNAPSHOT_PATH)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
     ENV = dotenv_values()
     print(f'\n\n\n=============== {now()} ===============')
 
+    diff_mode = 'diff' in argv
+    today = now('%Y-%m-%d')
+    snapshot = load_snapshot()
+    if snapshot.get('date') != today:  # 每天第一次运行发送完整列表
+        snapshot = {'date': today}
+    baseline = snapshot.get('lofs')  # 上次提醒时的数据
 
-    result = main()
-    if len(result) == 0:
-        print('没有明显折价且可以申购的LOF基金')
-        sys.exit(0)
+    rows, not_modified = fetch_lof_rows()
+    if not_modified:
+        print('集思录数据未更新(304)')
+        if diff_mode and baseline is not None:
+            return
+    with metrics.timer('parse_seconds', parser='jisilu'):
+        columns = to_columns(rows)
 
-    title, content = 'LOF折价', '\n\n'.join(['- ' + line for line in result])
-    try:
-        Feishu(ENV['FEISHU_WEBHOOK_TOKEN']).send_markdown(title, content)
-    finally:
-        cate, icon = '折价套利', '💰'
-        Pushme(ENV['PUSHME_PUSH_KEY']).send_markdown(f'[#{cate}!{icon}]'+title, content)
+    if diff_mode and baseline is not None:
+        lines, snapshot['lofs'] = diff_lofs(baseline, select_lofs(columns, PREMIUM_THRESHOLD - HYSTERESIS))
+        save_snapshot(snapshot)
+        if not lines:
+            print(f'LOF溢价列表没有明显变化({len(snapshot["lofs"])}只)')
+            return
+        title = 'LOF溢价变化'
+    else:
+        current = snapshot['lofs'] = select_lofs(columns)
+        save_snapshot(snapshot)
+        lines = [format_lof(fund_id, lof) for fund_id, lof in current.items()]
+        if not lines:
+            print('没有明显溢价且可以申购的LOF基金')
+            return
+        title = 'LOF折价'
+
+    content = '\n\n'.join(['- ' + line for line in lines])
+    print(content)
+    get_notifier(ENV).send_markdown(title, content, cate='折价套利', icon='💰')
 
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+""" 货币ETF折价扫描：一个监控盯一篮子场内货币基金
+盘中由 finance.tick_engine 统一驱动；单独运行: python -m finance.mmf_scanner [511880 511990 ...]
+
+原来 FundMonitor 只盯 511880、HuaBaoMonitor 只盯 511990（净值写死），多盯一个基金就要多一个进程。
+这里：
+1. 盘前用本地净值缓存(finance.nav_store)和 finance.nav_forecast 一次算出所有基金的下次预估净值；
+   NAV_OVERRIDE / .env 的 MMF_NAV_OVERRIDE="511990=100.0029" 可以直接指定（净值按份额结转的基金）
+2. 每个 tick 的行情来自引擎合并后的一次批量请求，整篮子的折价、单利年化用数组一次算出
+3. 只对折价 >= MIN_DISCOUNT 的前 TOP_N 名提醒，且同一基金当天只有折价创新高才再提醒
+"""
+import sys
+from datetime import datetime, time as dt_time
+from typing import Dict, List, Optional
+
+import numpy as np
+from dotenv import dotenv_values
+
+from pyutils.date_util import now, now_time
+from common import metrics
+from common.notify import get_notifier
+from common.outbox import get_outbox
+from finance.nav_forecast import forecast, nav_matrix
+from finance.nav_store import NavStore
+from finance.quote import Quote, to_symbol
+from finance.tick_engine import TickEngine
+from finance.trade_calendar import earn_days, is_trading_day, next_trading_day
+
+
+UNIVERSE = ['511880', '511990', '511660', '511850', '511690']
+NAV_OVERRIDE = {'511990': 100.0029}  # 与 HuaBaoMonitor 一致
+MIN_DISCOUNT = 0.5 / 10000  # 万分之0.5
+TOP_N = 2
+TRADING_HOURS = ((dt_time(9, 30), dt_time(11, 30)), (dt_time(13, 0), dt_time(15, 0)))
+
+
+def parse_overrides(text: Optional[str]) -> Dict[str, float]:
+    """ "511990=100.0029,511660=100.001" -> {code: nav} """
+    overrides = {}
+    for item in (text or '').split(','):
+        code, _, nav = item.partition('=')
+        if code.strip() and nav.strip():
+            overrides[code.strip()] = float(nav)
+    return overrides
+
+
+class MMFScanner:
+    name = '货币ETF扫描'
+
+    def __init__(self, codes: List[str] = UNIVERSE, env=None, top_n: int = TOP_N, min_discount: float = MIN_DISCOUNT):
+        self.env = env if env is not None else dotenv_values()
+        self.codes = list(codes)
+        self.top_n = top_n
+        self.min_discount = min_discount
+        self.overrides = dict(NAV_OVERRIDE, **parse_overrides(self.env.get('MMF_NAV_OVERRIDE')))
+        self.outbox = None  # None 时用 get_outbox()，回放时由 TickEngine 注入
+        self.names: Dict[str, str] = {}
+        self.navs = np.zeros(0)        # 下次预估净值，与 self.codes 对齐
+        self.lows = np.zeros(0)
+        self.alerted = np.zeros(0)     # 当天已提醒的最高折价
+
+    @property
+    def symbols(self) -> List[str]:
+        return [to_symbol(code) for code in self.codes]
+
+    def estimate(self) -> Dict[str, float]:
+        """ 所有基金的下次预估净值，返回 {code: nav}；没有净值数据的基金剔除 """
+        stores = {code: NavStore(code) for code in self.codes if code not in self.overrides}
+        for store in stores.values():
+            store.refresh()
+        stores = {code: store for code, store in stores.items() if store.points}
+        self.names = {code: store.name for code, store in stores.items()}
+
+        estimates, lows = dict(self.overrides), dict(self.overrides)
+        if stores:
+            dates, navs = nav_matrix({code: store.points for code, store in stores.items()})
+            next_earn = np.array([earn_days(next_trading_day(store.latest_date)) for store in stores.values()])
+            with metrics.timer('stage_seconds', stage='estimate'):
+                result = forecast(navs, dates, next_earn)
+            for i, code in enumerate(stores):
+                estimates[code], lows[code] = float(result.nav[i]), float(result.low[i])
+        self.codes = [code for code in self.codes if code in estimates]
+        self.navs = np.array([estimates[code] for code in self.codes])
+        self.lows = np.array([lows[code] for code in self.codes])
+        self.alerted = np.zeros(len(self.codes))
+        return dict(zip(self.codes, self.navs.tolist()))
+
+    def prepare(self) -> bool:
+        if not is_trading_day(now_time()):
+            print(f"今天({now_time().strftime('%Y-%m-%d')})不是交易日")
+            return False
+        for code, nav in self.estimate().items():
+            print(f"{self.names.get(code, code)}({code}) 下次预估净值: {nav:.4f}")
+        return bool(self.codes)
+
+    def is_active(self, now: datetime) -> bool:
+        current = now.time()
+        return any(start <= current <= end for start, end in TRADING_HOURS)
+
+    def is_finished(self, now: datetime) -> bool:
+        return now.strftime('%H:%M:%S') > '15:00:00'
+
+    def scan(self, snapshot: Dict[str, Quote]):
+        """ 整篮子一次计算，返回 (prices, discounts, 单利年化%)，缺价格的为 NaN """
+        quotes = [snapshot.get(symbol) for symbol in self.symbols]
+        prices = np.array([q.price if q and q.price > 0 else np.nan for q in quotes])
+        discounts = (self.navs - prices) / self.navs
+        return prices, discounts, discounts * 365 * 100
+
+    def on_tick(self, snapshot: Dict[str, Quote], now: datetime):
+        prices, discounts, annual = self.scan(snapshot)
+        time_str = now.strftime('%H:%M:%S')
+        ranked = np.argsort(-np.nan_to_num(discounts, nan=-np.inf))
+        print(f"{time_str} - " + ', '.join(f"{self.codes[i]} {discounts[i]*10000:.2f}‱" for i in ranked if not np.isnan(discounts[i])))
+
+        for i in ranked[:self.top_n]:
+            if not (discounts[i] >= self.min_discount and discounts[i] > self.alerted[i]):
+                continue
+            self.alerted[i] = discounts[i]
+            code = self.codes[i]
+            title = f'货币ETF折价 {self.names.get(code, code)}({code})'
+            content = '\n\n'.join([
+                f'- 预估净值: {self.navs[i]:.4f} (下沿 {self.lows[i]:.4f})',
+                f'- 场内价格: {prices[i]:.4f} ({time_str})',
+                f'- 折价: {discounts[i]*10000:.2f}‱   (单利年化:{annual[i]:.2f}%)',
+            ])
+            print(f"\033[91m{title} {content.replace(chr(10), ' ')}\033[0m")
+            (self.outbox or get_outbox()).put(f'fund:{code}', title, content, cate='套利', icon='😀')
+
+    def run(self):
+        TickEngine([self], notifier=get_notifier(self.env)).run()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    ENV = dotenv_values()
+    print(f'\n\n\n=============== {now()} ===============')
+
+    MMFScanner(argv or UNIVERSE, ENV).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+""" 货币ETF下次净值预估（numpy 向量化，多基金一次算完）
+
+原 calculate_median_growth 对最近10个净值差取绝对值的中位数：周五/节前的净值包含多天收益，
+直接混在一起取中位数会偏高，而且只有一种估计。这里：
+1. 净值矩阵 navs (基金数 x 日期数，缺失为 NaN) 按列差分，得到每期增长
+2. 除以每期包含的收益天数(trade_calendar.earn_days)，得到单日增长；负增长视为分红除息，剔除
+3. 对最近 window 个单日增长分别计算 中位数 / 截尾均值 / EWMA 三种估计
+4. 下次净值 = 最新净值 + 单日增长 x 下次收益天数；误差带取单日增长标准差 x z x 收益天数，
+   再与三种估计的离散程度取较大者
+
+用法:
+    from finance.nav_forecast import forecast, nav_matrix
+    dates, navs = nav_matrix({'511880': store.points, ...})
+    result = forecast(navs, dates, next_earn=3)
+    result.next_nav['median'], result.low, result.high
+"""
+import warnings
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Sequence, Union
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from finance.trade_calendar import earn_days
+
+
+WINDOW = 10      # 参与估计的最近单日增长个数（与原 calculate_median_growth 一致）
+TRIM = 0.2       # 截尾均值两端各去掉的比例
+ALPHA = 0.3      # EWMA 平滑系数，越大越看重最近几天
+Z = 2.0          # 误差带宽度（标准差倍数）
+ESTIMATORS = ('median', 'trimmed', 'ewma')
+TZ = ZoneInfo('Asia/Shanghai')
+
+
+@dataclass
+class Forecast:
+    latest: np.ndarray               # 最新净值
+    per_day: Dict[str, np.ndarray]   # 各估计的单日增长
+    next_nav: Dict[str, np.ndarray]  # 各估计的下次净值
+    std: np.ndarray                  # 单日增长标准差
+    low: np.ndarray                  # 误差带下沿（以 primary 估计为中心）
+    high: np.ndarray                 # 误差带上沿
+    samples: np.ndarray              # 参与估计的有效样本数
+    primary: str = 'median'
+
+    @property
+    def nav(self) -> np.ndarray:
+        return self.next_nav[self.primary]
+
+
+def nav_matrix(histories: Dict[str, Sequence[Sequence[float]]], last: int = WINDOW + 1):
+    """
+    把各基金的 [[x(ms), y], ...] 按日期对齐成矩阵
+    返回 (dates: List[date] 升序, navs: ndarray 基金数 x 日期数，行顺序同 histories)
+    """
+    all_x = sorted({x for points in histories.values() for x, _ in points[-last:]})
+    column = {x: i for i, x in enumerate(all_x)}
+    navs = np.full((len(histories), len(all_x)), np.nan)
+    for row, points in enumerate(histories.values()):
+        for x, y in points[-last:]:
+            navs[row, column[x]] = y
+    dates = [datetime.fromtimestamp(x / 1000, TZ).date() for x in all_x]
+    return dates, navs
+
+
+def _last_valid(navs: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(navs)
+    idx = navs.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    return navs[np.arange(len(navs)), idx]
+
+
+def _increments(navs: np.ndarray, dates: Sequence[date], window: int) -> np.ndarray:
+    """ 最近 window 个单日增长（基金数 x window，无效为 NaN） """
+    # 缺失日期先向前填充，跨缺口的差值除以自上一个有效净值以来各期收益天数的合计
+    days = np.array([earn_days(d) for d in dates[1:]], dtype=float)
+    filled = navs.copy()
+    span = np.empty((len(navs), len(days)))
+    pending = np.zeros(len(navs))
+    for j in range(1, filled.shape[1]):
+        gap = np.isnan(filled[:, j])
+        filled[gap, j] = filled[gap, j - 1]
+        pending += days[j - 1]
+        span[:, j - 1] = pending
+        pending[~gap] = 0
+    diffs = np.diff(filled, axis=1)
+    per_day = diffs / span
+    per_day[np.isnan(navs[:, 1:]) | (per_day < 0)] = np.nan  # 缺失当天或分红除息
+    return per_day[:, -window:]
+
+
+def _trimmed_mean(values: np.ndarray, trim: float) -> np.ndarray:
+    ordered = np.sort(values, axis=1)  # NaN 排在最后
+    count = np.sum(~np.isnan(values), axis=1)
+    cut = np.floor(count * trim).astype(int)
+    cumsum = np.concatenate([np.zeros((len(values), 1)), np.nancumsum(ordered, axis=1)], axis=1)
+    rows = np.arange(len(values))
+    kept = count - 2 * cut
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(kept > 0, (cumsum[rows, count - cut] - cumsum[rows, cut]) / kept, np.nan)
+
+
+def _ewma(values: np.ndarray, alpha: float) -> np.ndarray:
+    age = np.arange(values.shape[1])[::-1]  # 最右边最新，age=0
+    weights = np.where(np.isnan(values), 0.0, alpha * (1 - alpha) ** age)
+    total = weights.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, np.nansum(values * weights, axis=1) / total, np.nan)
+
+
+def forecast(navs: np.ndarray, dates: Sequence[date], next_earn: Union[int, np.ndarray],
+             window: int = WINDOW, trim: float = TRIM, alpha: float = ALPHA, z: float = Z,
+             primary: str = 'median') -> Forecast:
+    """ navs: 基金数 x 日期数（日期升序），next_earn: 下次净值包含的收益天数（标量或每个基金一个） """
+    navs = np.atleast_2d(np.asarray(navs, dtype=float))
+    increments = _increments(navs, dates, window)
+    samples = np.sum(~np.isnan(increments), axis=1)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # 没有有效样本的行
+        per_day = {
+            'median': np.nanmedian(increments, axis=1),
+            'trimmed': _trimmed_mean(increments, trim),
+            'ewma': _ewma(increments, alpha),
+        }
+        std = np.nanstd(increments, axis=1)
+    per_day = {k: np.nan_to_num(v) for k, v in per_day.items()}
+    std = np.nan_to_num(std)
+
+    latest = _last_valid(navs)
+    next_earn = np.asarray(next_earn, dtype=float)
+    next_nav = {k: latest + v * next_earn for k, v in per_day.items()}
+    spread = np.max(np.stack(list(next_nav.values())), axis=0) - np.min(np.stack(list(next_nav.values())), axis=0)
+    half = np.maximum(z * std * next_earn, spread / 2)
+    center = next_nav[primary]
+    return Forecast(latest, per_day, next_nav, std, center - half, center + half, samples, primary)
+
+
+def forecast_history(history: List[Dict], next_earn: int, **kwargs) -> Forecast:
+    """ 单个基金：history 为 Data_netWorthTrend 格式 [{'x','y'}, ...]（顺序不限） """
+    dates, navs = nav_matrix({'_': sorted([h['x'], h['y']] for h in history)}, last=len(history))
+    return forecast(navs, dates, next_earn, **kwargs)
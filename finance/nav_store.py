@@ -0,0 +1,188 @@
+""" 基金历史净值本地缓存，按净值发布增量更新
+
+原来每次启动都整份下载 pingzhongdata/{code}.js（几百KB、好几年的数据，还带时间戳防缓存），只用最后20条。
+这里每个基金一个 data/nav/{code}.json，保存 [[x(ms), y], ...]（与 Data_netWorthTrend 的 x/y 相同，按日期升序）：
+- 第一次（或缓存太旧）从 pingzhongdata 初始化，只从数组尾部解码最近 KEEP_POINTS 条
+- 之后只用 f10/lsjz 接口取最近几条净值补齐
+- 已经有最新一期净值（T 日净值在 T 日 NAV_PUBLISH_HOUR 点后发布）就不联网；
+  还没发布或下载失败时，RETRY_INTERVAL 内不重复请求
+
+用法:
+    store = NavStore('511880')
+    store.refresh()
+    store.history(20)   # [{'x': ms, 'y': 净值}, ...] 最新在前
+"""
+import json
+import re
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from common import metrics, upstream
+from finance.trade_calendar import is_trading_day
+
+
+NAV_DIR = Path(__file__).resolve().parent.parent / 'data' / 'nav'
+PINGZHONG_URL = upstream.url('https://fund.eastmoney.com/pingzhongdata/{code}.js')
+LSJZ_URL = upstream.url('https://api.fund.eastmoney.com/f10/lsjz')
+NAV_PUBLISH_HOUR = 18       # 当天净值一般在这之后可以取到
+RETRY_INTERVAL = 1800       # 净值未更新/下载失败后的重试间隔(秒)
+INCREMENT_MAX_DAYS = 60     # 缓存落后超过这么多天就整份重新初始化
+KEEP_POINTS = 1000          # 本地最多保留的净值条数
+TZ = ZoneInfo('Asia/Shanghai')
+
+
+def _date_to_ms(day: date) -> int:
+    return int(datetime.combine(day, datetime.min.time(), TZ).timestamp() * 1000)
+
+
+def _ms_to_date(ms: int) -> date:
+    return datetime.fromtimestamp(ms / 1000, TZ).date()
+
+
+def expected_nav_date(now: Optional[datetime] = None) -> date:
+    """ 此刻应当能取到的最新净值日期：最近一个已过发布时间的交易日 """
+    now = now or datetime.now(TZ)
+    day = now.date() if now.hour >= NAV_PUBLISH_HOUR else now.date() - timedelta(days=1)
+    for _ in range(30):
+        if is_trading_day(day):
+            return day
+        day -= timedelta(days=1)
+    return day
+
+
+_NAME_RE = re.compile(rb'fS_name\s*=\s*[\'"]([^\'"]+)[\'"]')
+_DATE_RE = re.compile(r'new Date\((\d{4}),(\d{1,2}),(\d{1,2})\)')
+
+
+def parse_net_worth_trend(raw: bytes, last: Optional[int] = None) -> List[Dict]:
+    """
+    只解码 Data_netWorthTrend 的最后 last 条（None 为全部）
+
+    数组元素是不含嵌套的 {"x":..,"y":..,"equityReturn":..,"unitMoney":".."}，
+    所以从结尾的 "];" 往前找 last 个 "{" 就是切片起点，只对这一小段做 json.loads，
+    不对整个文件跑正则、也不解码前面几年的数据。
+    """
+    anchor = raw.find(b'Data_netWorthTrend')
+    if anchor < 0:
+        raise ValueError('没有 Data_netWorthTrend')
+    start = raw.find(b'[', anchor)
+    end = raw.find(b'];', start)
+    if start < 0 or end < 0:
+        raise ValueError('Data_netWorthTrend 格式不完整')
+
+    if last is None:
+        pos = start + 1
+    else:
+        pos = end
+        for _ in range(last):
+            brace = raw.rfind(b'{', start, pos)
+            if brace < 0:
+                break
+            pos = brace
+    chunk = raw[pos:end].decode('utf-8')
+    if 'new Date(' in chunk:
+        chunk = _DATE_RE.sub(r'"\1-\2-\3"', chunk)
+    return json.loads(f'[{chunk}]')
+
+
+def parse_pingzhong(raw: bytes, last: Optional[int] = None, code: str = '') -> Dict:
+    """ 返回 {'name', 'points': [[x, y], ...]}，名称在文件开头，只在前 4KB 里找 """
+    name_match = _NAME_RE.search(raw, 0, 4096)
+    trend = parse_net_worth_trend(raw, last)
+    return {
+        'name': name_match.group(1).decode('utf-8') if name_match else code,
+        'points': [[item['x'], item['y']] for item in trend if 'x' in item and 'y' in item],
+    }
+
+
+def fetch_pingzhong(code: str, last: Optional[int] = KEEP_POINTS, timeout: float = 10) -> Dict:
+    """ 下载 pingzhongdata（条件请求，没变化时用 common.http 的本地副本），只解析最后 last 条净值 """
+    from common import http
+    headers = {'Referer': f'https://fund.eastmoney.com/{code}.html'}
+    response = http.get_cached(PINGZHONG_URL.format(code=code), headers=headers, timeout=timeout)
+    response.raise_for_status()
+    with metrics.timer('parse_seconds', parser='pingzhong'):
+        return parse_pingzhong(response.content, last, code)
+
+
+def fetch_lsjz(code: str, size: int, timeout: float = 10) -> List[List]:
+    """ 最近 size 条历史净值，返回 [[x, y], ...]（升序） """
+    from common import http
+    headers = {'Referer': 'https://fundf10.eastmoney.com/'}
+    params = {'fundCode': code, 'pageIndex': 1, 'pageSize': size}
+    response = http.get(LSJZ_URL, params=params, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    rows = ((response.json() or {}).get('Data') or {}).get('LSJZList') or []
+    points = []
+    for row in rows:
+        if row.get('FSRQ') and row.get('DWJZ'):
+            points.append([_date_to_ms(date.fromisoformat(row['FSRQ'])), float(row['DWJZ'])])
+    return sorted(points)
+
+
+class NavStore:
+    def __init__(self, code: str, root: Path = NAV_DIR):
+        self.code = code
+        self.path = Path(root) / f'{code}.json'
+        self.name = code
+        self.points: List[List] = []
+        self.checked = 0.0  # 上次联网检查的时间
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding='utf-8'))
+                self.name, self.points, self.checked = data['name'], data['points'], data.get('checked', 0.0)
+            except (ValueError, KeyError):
+                pass
+
+    @property
+    def latest_date(self) -> Optional[date]:
+        return _ms_to_date(self.points[-1][0]) if self.points else None
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        data = {'code': self.code, 'name': self.name, 'checked': self.checked, 'points': self.points[-KEEP_POINTS:]}
+        tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+        tmp.replace(self.path)
+
+    def merge(self, points: List[List]) -> int:
+        """ 合并新净值，返回新增条数 """
+        known = {x for x, _ in self.points}
+        added = [p for p in points if p[0] not in known]
+        if added:
+            self.points = sorted(self.points + added)
+        return len(added)
+
+    def needs_refresh(self, now: Optional[datetime] = None) -> bool:
+        latest = self.latest_date
+        if latest is not None and latest >= expected_nav_date(now):
+            return False
+        return time.time() - self.checked >= RETRY_INTERVAL
+
+    def refresh(self, now: Optional[datetime] = None, force: bool = False) -> int:
+        """ 按需联网更新，返回新增条数；失败时保留已有缓存 """
+        if not force and not self.needs_refresh(now):
+            return 0
+        from common import http
+        self.checked = time.time()
+        latest = self.latest_date
+        try:
+            if latest is None or (expected_nav_date(now) - latest).days > INCREMENT_MAX_DAYS:
+                data = fetch_pingzhong(self.code)
+                self.name = data['name']
+                added = self.merge(data['points'])
+            else:
+                added = self.merge(fetch_lsjz(self.code, (expected_nav_date(now) - latest).days + 1))
+            print(f'[净值] {self.name}({self.code}) 新增 {added} 条，最新 {self.latest_date}')
+        except (http.RequestException, ValueError, KeyError) as e:
+            print(f'[净值] 基金{self.code}更新失败，使用本地缓存({latest}): {e}')
+            added = 0
+        self.save()
+        return added
+
+    def history(self, n: int = 20) -> List[Dict]:
+        """ 最近 n 条净值，最新在前，格式同 Data_netWorthTrend """
+        return [{'x': x, 'y': y} for x, y in reversed(self.points[-n:])]
@@ -1,17 +1,29 @@
 """
-@crontab: 00,30 * * * * cd ${BASE_PATH} && python -m finance.news_ai_explain.py 2>&1 | tee -a news_ai_explain.log
+@crontab: 00,30 * * * * cd $reminder_home && $PYTHON -u -m finance.news_ai_explain onlytimes 2>&1 | tee -a logs/news_ai_explain.log
+
+每天48次运行里大部分在 onlytimes 判断后直接退出，common.http(requests)、openai 等重依赖都在用到时才导入
 """
 
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
 from zoneinfo import ZoneInfo
-import json, sys
+import json, math, sys, time
 
-from dotenv import load_dotenv, dotenv_values
-import requests
-import openai
+from dotenv import dotenv_values
 
-from pyutils.notify_util import Feishu, Pushme
+from common import metrics, upstream
+from common.notify import get_notifier
 from pyutils.date_util import now_time, now
+from finance import llm_cache, news_dedup
+from finance.news_store import NewsStore
+
+
+NEWS_API = upstream.url('https://newsapi.eastmoney.com/kuaixun/v1/getlist_102_ajaxResult_100_1_.html')  # 最新100条
+UA_HEADERS = {'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 18_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.5 Mobile/15E148 Safari/604.1 Edg/143.0.0.0'}
+PAGE_SIZE, MAX_PAGES = 100, 9
+SYSTEM_PROMPT = "你是财经新闻解读和个人投资建议助手。阅读下面内容，分类新闻，按重要性排序，并解读每个新闻的内在逻辑、市场影响和对个人投资者的投资影响"
+
 
 
 def get_start_end_time():
@@ -37,56 +49,196 @@ def get_start_end_time():
     return map_dict[now_hm] if now_hm in map_dict else ((nowtime-timedelta(hours=3)).strftime('%Y-%m-%d %H:%M:%S'), '9999-12-31 23:59:59')
 
 
-if __name__ == '__main__':
-    cfg = dotenv_values(".env")
-    news_api = 'https://newsapi.eastmoney.com/kuaixun/v1/getlist_102_ajaxResult_100_1_.html'  # 最新100条
-    ua_headers = {'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 18_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.5 Mobile/15E148 Safari/604.1 Edg/143.0.0.0'}
+def parse_news_page(text: str) -> List[dict]:
+    """ `var ajaxResult={...}` -> LivesList """
+    return json.loads(text[text.index('=') + 1:])['LivesList']
+
+
+def fetch_page(i: int) -> List[dict]:
+    from common import http  # 并发翻页共用 common.http 里这个 host 的连接池
+    resp = http.get(NEWS_API.replace('_100_1_', f'_100_{i}_'), headers=UA_HEADERS)
+    resp.raise_for_status()
+    with metrics.timer('parse_seconds', parser='news'):
+        return parse_news_page(resp.text)
+
+
+def estimate_pages(store: NewsStore, start_time: str) -> int:
+    """ 按本地快讯密度估算要翻到 start_time（或和上次抓取接上）需要几页 """
+    since = store.latest_showtime if store.covers(start_time) else start_time
+    since = datetime.strptime(since, '%Y-%m-%d %H:%M:%S').replace(tzinfo=now_time().tzinfo)
+    hours = max(0.0, (now_time() - since).total_seconds() / 3600)
+    return max(1, min(MAX_PAGES, math.ceil(hours * store.density() / PAGE_SIZE)))
+
+
+def fetch_news(store: NewsStore, start_time: str, concurrent: bool = True) -> int:
+    """
+    从第1页往后翻，新快讯写入 store，遇到以下情况停止：
+    - 页中出现本次运行前已有的快讯，且本地已连续覆盖 start_time 之后的部分
+    - 已翻到 start_time 之前
+    concurrent=True 时按估算的页数并发请求，每完成一页补发下一页，满足停止条件后不再发新页
+    （已发出的请求照常完成并写入 store）；concurrent=False 时逐页请求
+    返回新增条数
+    """
+    prior = set(store.items)
+    covered = store.covers(start_time)
+    workers = estimate_pages(store, start_time) if concurrent else 1
+    pages: Dict[int, List[dict]] = {}
+    stop_page = None
+    added = 0
+
+    def reached(page):
+        if not page or page[-1]['showtime'] < start_time:
+            return True
+        return covered and any(x['id'] in prior for x in page)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending, next_page = {}, 1
+        while pending or (stop_page is None and next_page <= MAX_PAGES):
+            while stop_page is None and next_page <= MAX_PAGES and len(pending) < workers:
+                pending[pool.submit(fetch_page, next_page)] = next_page
+                next_page += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = pending.pop(future)
+                page = pages[i] = future.result()
+                added += store.add(page)
+                if reached(page) and (stop_page is None or i < stop_page):
+                    stop_page = i
+    print(f'抓取页数: {len(pages)} (并发 {workers} 页)')
+
+    last = stop_page or max(pages)
+    if covered and any(x['id'] in prior for x in pages[last]):
+        # 和上次抓取的部分接上了，覆盖范围不变
+        return added
+    oldest = next((pages[i][-1]['showtime'] for i in range(last, 0, -1) if pages.get(i)), '')
+    if oldest:
+        store.mark_covered(oldest)
+    return added
+
+
+def format_usage(usage) -> str:
+    """ CompletionUsage(completion_tokens=1, prompt_tokens=2, total_tokens=3, ...) -> 前三项 """
+    return ", ".join(str(usage).split("(")[-1].split(", ")[:3])
+
+
+def record_llm_metrics(usage, elapsed: float, generating: float = None):
+    """
+    elapsed: 整个调用的耗时，记入 stage_seconds{stage="llm"}
+    generating: 生成耗时（流式为首个token之后），用于 tokens/s；不传时同 elapsed
+    """
+    metrics.observe('stage_seconds', elapsed, stage='llm')
+    if usage is None:
+        return
+    metrics.inc('llm_tokens_total', usage.prompt_tokens or 0, kind='prompt')
+    metrics.inc('llm_tokens_total', usage.completion_tokens or 0, kind='completion')
+    generating = elapsed if generating is None else generating
+    if generating > 0 and usage.completion_tokens:
+        metrics.set_gauge('llm_tokens_per_second', usage.completion_tokens / generating)
+
+
+def stream_completion(client, **kwargs) -> Tuple[str, str]:
+    """ 流式调用，边收边打印，返回 (完整内容, 用量) """
+    started = time.monotonic()
+    first_token = None
+    parts, usage = [], None
+    stream = client.chat.completions.create(**kwargs, stream=True, stream_options={'include_usage': True})
+    for chunk in stream:
+        if chunk.usage:
+            usage = chunk.usage
+        for choice in chunk.choices:
+            delta = choice.delta.content
+            if not delta:
+                continue
+            if not parts:
+                first_token = time.monotonic()
+                metrics.observe('llm_first_token_seconds', first_token - started)
+                print(f'首个token耗时: {first_token - started:.2f}秒')
+            parts.append(delta)
+            print(delta, end='', flush=True)
+    print()
+    finished = time.monotonic()
+    record_llm_metrics(usage, finished - started, finished - (first_token or started))
+    return ''.join(parts), format_usage(usage) if usage else ''
+
+
+def summarize(cfg, news: List[dict], stream: bool = False) -> Tuple[str, str, bool]:
+    """ AI总结新闻，返回 (总结, 用量, 是否命中缓存) """
+    model = cfg['OPENAI_MODEL_ID']
+    key = llm_cache.cache_key(model, SYSTEM_PROMPT, news)
+    cached = llm_cache.load(key)
+    if cached:
+        print(f'命中缓存 {key[:12]}'); print(cached['content'])
+        return cached['content'], cached['usage'], True
+
+    import openai
+    news_json = json.dumps(news, ensure_ascii=False, separators=(',',':')); # print(news_json)  # 紧密输出
+    client = openai.OpenAI(api_key=cfg['OPENAI_API_KEY'], base_url=upstream.url(cfg['OPENAI_BASE_URL']))
+    kwargs = dict(
+        #以此处为例，请确保替换为你实际在 build.nvidia.com 选择的模型名称
+        model=model,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": news_json}
+        ],
+        temperature=0.7,
+        top_p=0.95,
+        max_tokens=65535,
+    )
+    if stream:
+        content, usage = stream_completion(client, **kwargs)
+    else:
+        started = time.monotonic()
+        completion = client.chat.completions.create(**kwargs, stream=False)
+        record_llm_metrics(completion.usage, time.monotonic() - started)
+        content, usage = completion.choices[0].message.content, format_usage(completion.usage)
+        print(content)
+    print(usage)
+
+    llm_cache.save(key, content, usage)
+    return content, usage, False
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
 
     # 新闻时间范围，避免多次运行重复
     start_time, end_time = get_start_end_time()
     now_str = now('%Y-%m-%d %H:%M')
-    if '9999' in end_time and 'onlytime' in ''.join(sys.argv):
-        sys.exit(0)
+    if '9999' in end_time and 'onlytime' in ''.join(argv):
+        return
+    cfg = dotenv_values(".env")
     print(f'\n\n\n=============== {now()} ===============')
 
-    # 抓取东财7x24小时的最新N条，并按时间过滤
-    LivesList = list()
-    seen = set()
-    for i in range(1, 10):
-        resp = requests.get(news_api.replace('_100_1_', f'_100_{i}_'), headers=ua_headers)
-        data = json.loads(resp.text.split('=', 1)[-1])
-        LivesList.extend([x for x in data['LivesList'] if x['id'] not in seen and seen.add(x['id']) is None])
-        if LivesList[-1]['showtime'] < start_time:
-            break
-    print(f'len(LivesList) = {len(LivesList)}')
-
-    filter_LivesList = [{key:one[key] for key in ('showtime','title','digest')} for one in LivesList if start_time<=one['showtime']<end_time]  # url_unique
-    news_json = json.dumps(filter_LivesList, ensure_ascii=False, separators=(',',':')); # print(news_json)  # 紧密输出
+    # 增量抓取东财7x24小时的最新快讯，合并本地已抓取的部分后按时间过滤
+    store = NewsStore()
+    added = fetch_news(store, start_time, concurrent='serial' not in argv)
+    store.prune(now_time())
+    store.save()
+    print(f'新增 {added} 条, 本地共 {len(store.items)} 条, 最新: {store.latest_showtime}')
+
+    filter_LivesList = [{key:one[key] for key in ('showtime','title','digest')} for one in store.between(start_time, end_time)]  # url_unique
+    if not filter_LivesList:
+        print(f'{start_time} ~ {end_time} 没有快讯')
+        return
     real_start, real_end = min([x['showtime'] for x in filter_LivesList]), max([x['showtime'] for x in filter_LivesList])
 
+    # 近似重复的快讯只保留一条，并按 token 预算挑选
+    token_budget = int(cfg.get('NEWS_TOKEN_BUDGET') or news_dedup.DEFAULT_TOKEN_BUDGET)
+    filter_LivesList, dedup = news_dedup.select(filter_LivesList, token_budget)
+    print(f'去重: {dedup}')
 
-    # AI总结
-    client = openai.OpenAI(api_key=cfg['OPENAI_API_KEY'], base_url=cfg['OPENAI_BASE_URL'])
-    completion = client.chat.completions.create(
-        #以此处为例，请确保替换为你实际在 build.nvidia.com 选择的模型名称
-        model=cfg['OPENAI_MODEL_ID'],
-        messages=[
-            {"role": "system", "content": "你是财经新闻解读和个人投资建议助手。阅读下面内容，分类新闻，按重要性排序，并解读每个新闻的内在逻辑、市场影响和对个人投资者的投资影响"},
-            {"role": "user", "content": news_json}
-        ],
-        temperature=0.7,
-        top_p=0.95,
-        max_tokens=65535,
-        stream=False # 开启流式输出
-    )
-    news_ai_explain = completion.choices[0].message.content; print(news_ai_explain); print(completion.usage)
+
+    # AI总结（同一批新闻命中本地缓存时不再调用）
+    stream = 'stream' in argv or cfg.get('OPENAI_STREAM') == '1'
+    news_ai_explain, usage, cached = summarize(cfg, filter_LivesList, stream=stream)
 
     # 飞书通知
     title = f"财经新闻解读({now_str})"
-    footer = f'🤖 Generated by AI\n{start_time} ~ {end_time}\n{real_start} ~ {real_end}\n{", ".join(str(completion.usage).split("(")[-1].split(", ")[:3])}'
+    footer = (f'🤖 Generated by AI\n{start_time} ~ {end_time}\n{real_start} ~ {real_end}\n{usage}{" (缓存)" if cached else ""}\n'
+              f'快讯 {dedup["total"]}→{dedup["selected"]} 条 ({dedup["clusters"]} 簇), 节省≈{dedup["tokens_saved"]} tokens')
+
+    get_notifier(cfg).send_markdown(title, news_ai_explain, cate='7x24小时财经新闻', icon='📜', footer=footer)
 
-    try:
-        Feishu(cfg['FEISHU_WEBHOOK_TOKEN']).send_markdown(title, news_ai_explain, footer=footer)
-    finally:
-        Pushme(cfg['PUSHME_PUSH_KEY']).send_markdown('[#7x24小时财经新闻!📜]'+title, news_ai_explain)
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+""" 快讯近似去重和按 token 预算挑选
+
+东财快讯经常把同一条消息换个说法发好几遍，原样全部发给大模型既费 token 又拖慢生成：
+1. 对 title+digest 取3字 shingle，Jaccard 相似度 >= SIMILARITY 的归为一簇
+   （用 shingle 倒排索引只比较至少共享一个 shingle 的候选；快讯很短，改几个字 simhash 就差很多位，所以直接比 shingle）
+2. 每簇保留信息量最大（摘要最长）的一条，簇越大、越新排得越靠前
+3. 按顺序装入，直到估算的 token 数达到预算
+"""
+import json
+import re
+from collections import Counter
+from typing import Dict, List, Set, Tuple
+
+
+SHINGLE_SIZE = 3
+SIMILARITY = 0.5
+MAX_POSTING = 100  # “人民币”这类高频 shingle 不参与找候选
+DEFAULT_TOKEN_BUDGET = 24000
+
+_PUNCT_RE = re.compile(r'[\s\W_]+', re.UNICODE)
+
+
+def _text(one: dict) -> str:
+    return _PUNCT_RE.sub('', f"{one.get('title', '')}{one.get('digest', '')}")
+
+
+def shingles(text: str) -> Set[str]:
+    return {text[i:i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+
+
+def estimate_tokens(text: str) -> int:
+    """ 粗略估算：中日韩字符约1个token，其余字符约4个一个token """
+    cjk = sum(1 for ch in text if ord(ch) > 0x2E80)
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def cluster(news: List[dict], similarity: float = SIMILARITY) -> List[List[dict]]:
+    """ 近似重复的快讯归为一簇，返回簇列表（每簇内保持原顺序） """
+    sets = [shingles(_text(one)) for one in news]
+    parent = list(range(len(news)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    index: Dict[str, List[int]] = {}
+    for i, grams in enumerate(sets):
+        shared = Counter()
+        for gram in grams:
+            posting = index.setdefault(gram, [])
+            if len(posting) <= MAX_POSTING:
+                shared.update(posting)
+            posting.append(i)
+        for j, n in shared.items():
+            if n / (len(grams) + len(sets[j]) - n) >= similarity:
+                parent[find(i)] = find(j)
+
+    groups: Dict[int, List[dict]] = {}
+    for i, one in enumerate(news):
+        groups.setdefault(find(i), []).append(one)
+    return list(groups.values())
+
+
+def select(news: List[dict], token_budget: int = DEFAULT_TOKEN_BUDGET) -> Tuple[List[dict], dict]:
+    """
+    去重并按预算挑选，返回 (挑选后的快讯(按时间倒序), 统计)
+    统计: total/clusters/selected 条数，tokens_before/tokens_after/tokens_saved
+    """
+    def cost(one):
+        return estimate_tokens(json.dumps(one, ensure_ascii=False, separators=(',', ':')))
+
+    groups = cluster(news)
+    ranked = sorted(groups, key=lambda g: (len(g), max(x['showtime'] for x in g)), reverse=True)
+
+    selected, used = [], 0
+    for group in ranked:
+        representative = max(group, key=lambda x: len(x.get('digest', '')))
+        tokens = cost(representative)
+        if used + tokens > token_budget:
+            continue
+        selected.append(representative)
+        used += tokens
+
+    tokens_before = sum(cost(one) for one in news)
+    stats = {
+        'total': len(news), 'clusters': len(groups), 'selected': len(selected),
+        'tokens_before': tokens_before, 'tokens_after': used, 'tokens_saved': tokens_before - used,
+    }
+    return sorted(selected, key=lambda x: x['showtime'], reverse=True), stats
@@ -0,0 +1,90 @@
+""" 东财7x24快讯的本地存储和抓取游标
+
+data/news_store.json 保存最近 KEEP_HOURS 小时内抓到的快讯（只保留 id/showtime/title/digest）以及游标：
+- latest_id / latest_showtime   上次抓到的最新一条
+- covered_since                 从这个时间到 latest_showtime 之间的快讯本地都是连续完整的
+
+这样每次运行只需从第1页往后翻，直到遇到一整页都已知的快讯就可以停止，时间窗口内更早的部分直接读本地。
+"""
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+STORE_FILE = DATA_DIR / 'news_store.json'
+KEEP_HOURS = 30  # 最长的时间窗口是前一日15:00到当日09:00共18小时，留些余量
+KEEP_KEYS = ('id', 'showtime', 'title', 'digest')
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class NewsStore:
+    def __init__(self, path: Path = STORE_FILE):
+        self.path = path
+        self.items: Dict[str, dict] = {}
+        self.latest_id = ''
+        self.latest_showtime = ''
+        self.covered_since = ''
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+                self.items = {x['id']: x for x in data.get('items', [])}
+                self.latest_id = data.get('latest_id', '')
+                self.latest_showtime = data.get('latest_showtime', '')
+                self.covered_since = data.get('covered_since', '')
+            except (ValueError, KeyError) as e:
+                print(f'读取 {path} 失败，重新抓取: {e}')
+
+    def __contains__(self, news_id: str) -> bool:
+        return news_id in self.items
+
+    def add(self, news: Iterable[dict]) -> int:
+        """ 加入新快讯，返回其中未见过的条数 """
+        count = 0
+        for one in news:
+            if one['id'] in self.items:
+                continue
+            self.items[one['id']] = {key: one.get(key, '') for key in KEEP_KEYS}
+            count += 1
+            if one['showtime'] > self.latest_showtime:
+                self.latest_id, self.latest_showtime = one['id'], one['showtime']
+        return count
+
+    def covers(self, start_time: str) -> bool:
+        """ 本地是否已连续覆盖 start_time 之后的全部快讯 """
+        return bool(self.covered_since) and self.covered_since <= start_time
+
+    def mark_covered(self, since: str):
+        self.covered_since = since
+
+    def density(self, default: float = 60.0) -> float:
+        """ 本地快讯的平均密度(条/小时)，用于估算需要翻几页 """
+        if len(self.items) < 2:
+            return default
+        times = sorted(x['showtime'] for x in self.items.values())
+        hours = (datetime.strptime(times[-1], TIME_FORMAT) - datetime.strptime(times[0], TIME_FORMAT)).total_seconds() / 3600
+        return len(times) / hours if hours > 0 else default
+
+    def between(self, start_time: str, end_time: str) -> List[dict]:
+        """ [start_time, end_time) 内的快讯，按时间倒序（与接口返回顺序一致） """
+        news = [x for x in self.items.values() if start_time <= x['showtime'] < end_time]
+        return sorted(news, key=lambda x: x['showtime'], reverse=True)
+
+    def prune(self, now: datetime):
+        cutoff = (now - timedelta(hours=KEEP_HOURS)).strftime(TIME_FORMAT)
+        self.items = {k: v for k, v in self.items.items() if v['showtime'] >= cutoff}
+        if self.covered_since and self.covered_since < cutoff:
+            self.covered_since = cutoff
+
+    def save(self):
+        self.path.parent.mkdir(exist_ok=True)
+        data = {
+            'latest_id': self.latest_id,
+            'latest_showtime': self.latest_showtime,
+            'covered_since': self.covered_since,
+            'items': self.between('', '9999-12-31 23:59:59'),
+        }
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+        tmp.replace(self.path)
@@ -0,0 +1,183 @@
+""" 腾讯行情(qt.gtimg.cn)批量报价客户端
+
+多个代码合并成一次 q=sh511880,sh511990,... 请求，连接池由 common.http 按 host 共享，
+各监控脚本共用同一组 keep-alive 连接，避免每次轮询都重新握手。
+
+用法:
+    from finance.quote import fetch_quotes
+    quotes = fetch_quotes(['sh511880', '511990', 'sz131810'])
+    quotes['sh511880'].price
+"""
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from common import http, metrics, upstream
+
+
+QUOTE_URL = upstream.url('https://qt.gtimg.cn/q=')
+HEADERS = {'Referer': 'https://quote.eastmoney.com/'}
+MAX_SYMBOLS_PER_REQUEST = 60  # 单次 q= 参数的代码个数上限，避免URL过长
+
+
+class Quote:
+    """ 单个代码的行情，只保留用到的字段 """
+    __slots__ = ('symbol', 'name', 'price', 'pct')
+
+    def __init__(self, symbol: str, name: str, price: float, pct: float):
+        self.symbol = symbol  # 带市场前缀的代码，如 sh511880
+        self.name = name      # [1] 名称
+        self.price = price    # [3] 当前价格（逆回购即年化利率）
+        self.pct = pct        # [32] 涨跌幅(%)
+
+    def __repr__(self):
+        return f'Quote(symbol={self.symbol!r}, name={self.name!r}, price={self.price}, pct={self.pct})'
+
+    def __eq__(self, other):
+        return isinstance(other, Quote) and all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+
+
+class QuoteTable:
+    """ 列式存放的一批行情，价格/涨跌幅为 array('d')，适合几百个代码一起处理 """
+    __slots__ = ('symbols', 'names', 'price', 'pct', 'index')
+
+    def __init__(self):
+        self.symbols: List[str] = []
+        self.names: List[str] = []
+        self.price = array('d')
+        self.pct = array('d')
+        self.index: Dict[str, int] = {}
+
+    def append(self, symbol: str, name: str, price: float, pct: float):
+        self.index[symbol] = len(self.symbols)
+        self.symbols.append(symbol)
+        self.names.append(name)
+        self.price.append(price)
+        self.pct.append(pct)
+
+    def get(self, symbol: str) -> Optional[Quote]:
+        i = self.index.get(symbol)
+        if i is None:
+            return None
+        return Quote(symbol, self.names[i], self.price[i], self.pct[i])
+
+    def __len__(self):
+        return len(self.symbols)
+
+
+def to_symbol(code: str) -> str:
+    """ 补全市场前缀：已带 sh/sz 的原样返回，其余默认按沪市处理 """
+    code = code.strip()
+    if code[:2] in ('sh', 'sz'):
+        return code
+    return f'sh{code}'
+
+
+def iter_fields(raw: bytes, indices: Sequence[int]) -> Iterator[Tuple[str, List[bytes]]]:
+    """
+    直接在原始字节上切分，每条记录只切到所需的最大字段为止，不做整体解码
+    格式: v_sh511880="1~银华日利~511880~100.123~...";\nv_sh511990="...";
+    返回 (symbol, [indices 对应的原始字节])，缺少的字段为 b''，无效代码的记录（如 v_pv_none_match="1"）跳过
+    """
+    maxsplit = max(indices) + 1
+    for record in raw.split(b'";'):
+        eq = record.find(b'="')
+        if eq < 0:
+            continue
+        values = record[eq + 2:].split(b'~', maxsplit)
+        n = len(values)
+        if n < 2:
+            continue
+        yield record[record.find(b'v_') + 2:eq].decode('ascii'), [values[i] if i < n else b'' for i in indices]
+
+
+QUOTE_FIELDS = (1, 3, 32)  # 名称、当前价格、涨跌幅
+
+
+def _iter_quotes(raw: bytes):
+    """ iter_fields 针对 QUOTE_FIELDS 的展开版本，省掉一层生成器和列表 """
+    for record in raw.split(b'";'):
+        eq = record.find(b'="')
+        if eq < 0:
+            continue
+        values = record[eq + 2:].split(b'~', 33)
+        if len(values) < 33:
+            if len(values) < 4:
+                continue
+            values += [b''] * (33 - len(values))
+        price, pct = values[3], values[32]
+        try:
+            price = float(price) if price else 0.0
+            pct = float(pct) if pct else 0.0
+        except ValueError:
+            continue
+        # 腾讯接口是 GBK 编码，只解码用到的名称字段
+        yield record[record.find(b'v_') + 2:eq].decode('ascii'), values[1].decode('gbk', errors='replace'), price, pct
+
+
+def parse_quotes(raw: bytes) -> Dict[str, Quote]:
+    """ 解析腾讯行情响应为 {symbol: Quote} """
+    return {symbol: Quote(symbol, name, price, pct) for symbol, name, price, pct in _iter_quotes(raw)}
+
+
+def parse_quote_table(raw: bytes) -> QuoteTable:
+    """ 解析腾讯行情响应为列式 QuoteTable """
+    table = QuoteTable()
+    for row in _iter_quotes(raw):
+        table.append(*row)
+    return table
+
+
+class QuoteClient:
+    def __init__(self, timeout: float = 5):
+        self.timeout = timeout
+
+    def fetch_raw(self, codes: Iterable[str]) -> Iterator[bytes]:
+        """
+        按 MAX_SYMBOLS_PER_REQUEST 分批请求，逐批返回原始响应字节
+        失败的批次打印告警后跳过，调用方按缺失处理
+        """
+        symbols = list(dict.fromkeys(to_symbol(code) for code in codes))
+        for i in range(0, len(symbols), MAX_SYMBOLS_PER_REQUEST):
+            batch = symbols[i:i + MAX_SYMBOLS_PER_REQUEST]
+            try:
+                response = http.get(QUOTE_URL + ','.join(batch), headers=HEADERS, timeout=self.timeout)
+                response.raise_for_status()
+                yield response.content
+            except http.RequestException as e:
+                print(f"[警告] 获取行情失败({','.join(batch)}): {e}")
+
+    def fetch(self, codes: Iterable[str]) -> Dict[str, Quote]:
+        """ 批量获取实时行情，返回 {symbol: Quote} """
+        quotes = {}
+        for raw in self.fetch_raw(codes):
+            with metrics.timer('parse_seconds', parser='quote'):
+                quotes.update(parse_quotes(raw))
+        return quotes
+
+    def fetch_table(self, codes: Iterable[str]) -> QuoteTable:
+        """ 批量获取实时行情，返回列式 QuoteTable """
+        table = QuoteTable()
+        for raw in self.fetch_raw(codes):
+            with metrics.timer('parse_seconds', parser='quote'):
+                for row in _iter_quotes(raw):
+                    table.append(*row)
+        return table
+
+    def fetch_one(self, code: str) -> Optional[Quote]:
+        symbol = to_symbol(code)
+        return self.fetch([symbol]).get(symbol)
+
+
+_client: Optional[QuoteClient] = None
+
+
+def get_client() -> QuoteClient:
+    """ 进程内共享的报价客户端 """
+    global _client
+    if _client is None:
+        _client = QuoteClient()
+    return _client
+
+
+def fetch_quotes(codes: Iterable[str]) -> Dict[str, Quote]:
+    return get_client().fetch(codes)
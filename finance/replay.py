@@ -0,0 +1,278 @@
+""" 盯盘告警逻辑回放：模拟时钟 + 历史/合成行情，离线跑完一整天并扫描阈值
+
+原来 FundMonitor / HuaBaoMonitor / RepoMonitor 的告警规则只能盘中实盘试，一分钟一个 tick。
+这里用 SimClock 代替 now_time()/time.sleep，行情源从行情库(finance.tick_store)或合成序列按模拟时间取值，
+提醒写入 AlertSink 只记录不发送，仍然走 TickEngine 和各监控的 on_tick，一天几百个 tick 毫秒级跑完。
+
+用法:
+    python -m finance.replay repo --day 20250102 --grid base_threshold=1.5:3.0:0.1
+    python -m finance.replay fund --grid warning_discount=0.00002:0.0001:0.00001 --grid nav=100.0050,100.0080
+    python -m finance.replay huabao --synthetic --seed 7 --grid low_price=99.990:99.996:0.001
+
+不给 --day 或指定 --synthetic 时使用合成行情（随机游走 + 偶发尖峰）。
+--grid 可以给多次，值为逗号列表或 start:stop:step，按笛卡尔积组合。
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from finance.quote import Quote, to_symbol
+from finance.tick_engine import TickEngine
+from finance.tick_store import TickStore
+
+
+TZ = ZoneInfo('Asia/Shanghai')
+DAY_START = '09:25'
+DAY_END = '15:31'
+
+# 各监控的合成行情参数：代码(None 表示用 gznhg.CODES)、基准价、随机游走波动、尖峰幅度
+KINDS = {
+    'fund': {'symbols': ['sh511880'], 'base': 100.000, 'vol': 0.0015, 'spike': 0.008},
+    'huabao': {'symbols': ['sh511990'], 'base': 100.000, 'vol': 0.0015, 'spike': 0.008},
+    'repo': {'symbols': None, 'base': 1.6, 'vol': 0.03, 'spike': 1.5},
+}
+
+
+class SimClock:
+    """ 模拟时钟：sleep 只推进时间，不真正等待 """
+
+    def __init__(self, start: datetime):
+        self.current = start
+        self.elapsed = 0.0
+
+    def now(self) -> datetime:
+        return self.current
+
+    def monotonic(self) -> float:
+        return self.elapsed
+
+    def sleep(self, seconds: float):
+        self.current += timedelta(seconds=seconds)
+        self.elapsed += seconds
+
+
+class Series(NamedTuple):
+    """ 单个代码的行情序列，ts 为毫秒时间戳（升序） """
+    ts: np.ndarray
+    price: np.ndarray
+    pct: np.ndarray
+
+
+class ReplaySource:
+    """ 按模拟时钟取每个代码最近一条行情，接口与 QuoteClient.fetch 一致 """
+
+    def __init__(self, series: Dict[str, Series], clock: SimClock, names: Optional[Dict[str, str]] = None):
+        self.series = series
+        self.clock = clock
+        self.names = names or {}
+
+    def fetch(self, symbols: Iterable[str]) -> Dict[str, Quote]:
+        now_ms = int(self.clock.now().timestamp() * 1000)
+        snapshot = {}
+        for symbol in symbols:
+            s = self.series.get(symbol)
+            if s is None:
+                continue
+            i = int(np.searchsorted(s.ts, now_ms, side='right')) - 1
+            if i >= 0:
+                snapshot[symbol] = Quote(symbol, self.names.get(symbol, symbol), float(s.price[i]), float(s.pct[i]))
+        return snapshot
+
+
+class Alert(NamedTuple):
+    time: datetime
+    key: str
+    title: str
+    channels: Tuple[str, ...]
+
+
+class AlertSink:
+    """ 代替发件箱，只记录提醒和模拟时间 """
+
+    def __init__(self, clock: SimClock):
+        self.clock = clock
+        self.alerts: List[Alert] = []
+
+    def put(self, key, title, content, cate='', icon='', channels=('feishu', 'pushme'), now=None):
+        self.alerts.append(Alert(self.clock.now(), key, title, tuple(channels)))
+        return len(self.alerts)
+
+
+class NullStore:
+    """ 回放时不重复落盘 """
+
+    def append(self, now, snapshot):
+        return 0
+
+    def close(self):
+        pass
+
+
+def _parse_day(day: str) -> date:
+    return datetime.strptime(day, '%Y%m%d').date()
+
+
+def _at(day: date, hhmm: str) -> datetime:
+    return datetime.combine(day, datetime.strptime(hhmm, '%H:%M').time(), TZ)
+
+
+def kind_symbols(kind: str) -> List[str]:
+    if KINDS[kind]['symbols'] is None:
+        from finance.gznhg import CODES
+        return list(CODES)
+    return KINDS[kind]['symbols']
+
+
+def load_series(day: date, symbols: Sequence[str], store: Optional[TickStore] = None) -> Dict[str, Series]:
+    """ 从行情库读取某天的记录 """
+    store = store or TickStore()
+    records = store.read_day(day)
+    series = {}
+    for symbol in symbols:
+        sid = store.symbol_id(symbol, create=False)
+        if sid is None:
+            continue
+        rows = records[records['sid'] == sid]
+        if len(rows):
+            series[to_symbol(symbol)] = Series(np.asarray(rows['ts']), np.asarray(rows['price']), np.asarray(rows['pct']))
+    return series
+
+
+def synthetic_series(kind: str, day: date, seed: int = 0) -> Dict[str, Series]:
+    """ 合成行情：每分钟一条，均值回复的随机游走，约 2% 的点叠加向上/向下尖峰 """
+    spec = KINDS[kind]
+    rng = np.random.default_rng(seed)
+    start, end = _at(day, DAY_START), _at(day, DAY_END)
+    ts = np.arange(int(start.timestamp()), int(end.timestamp()), 60, dtype=np.int64) * 1000
+    series = {}
+    for symbol in kind_symbols(kind):
+        noise = rng.normal(0, spec['vol'], len(ts))
+        walk = np.empty(len(ts))
+        level = 0.0
+        for i, step in enumerate(noise):
+            level = 0.9 * level + step
+            walk[i] = level
+        spikes = rng.random(len(ts)) < 0.02
+        if kind == 'repo':
+            price = np.round(np.maximum(0.001, spec['base'] * (1 + walk) + spikes * rng.exponential(spec['spike'], len(ts))), 3)
+        else:
+            price = np.round(spec['base'] + walk - spikes * rng.exponential(spec['spike'], len(ts)), 3)
+        pct = np.zeros(len(ts), dtype=np.float32)
+        series[symbol] = Series(ts, price, pct)
+    return series
+
+
+def make_monitor(kind: str, params: Dict[str, float], series: Dict[str, Series], day: date):
+    """ 构造监控并直接设置盘前状态（不联网获取净值） """
+    if kind == 'fund':
+        from finance.discount_511880 import FundMonitor
+        monitor = FundMonitor('511880', cfg={})
+        prices = series[monitor.symbols[0]].price if monitor.symbols[0] in series else np.array([100.0])
+        # 默认预估净值：使全天价格中位数恰好处于万分之0.5折价
+        monitor.next_estimated_nav = params.get('nav') or float(np.median(prices)) * (1 + 0.5 / 10000)
+        monitor.latest_nav = monitor.next_estimated_nav
+        monitor.next_nav_low = monitor.next_nav_high = monitor.next_estimated_nav
+        monitor.latest_nav_date = monitor.next_estimated_date = day
+    elif kind == 'huabao':
+        from finance.discount_huabao import HuaBaoMonitor
+        monitor = HuaBaoMonitor('511990', env={})
+        monitor.tonight_nav_estimated = params.get('nav') or 100.0029
+        monitor.alerted_price = float('inf')
+    else:
+        from finance.gznhg import RepoMonitor
+        monitor = RepoMonitor(env={})
+        monitor.current_date = day
+    for name, value in params.items():
+        if name != 'nav':
+            if not hasattr(monitor, name):
+                raise ValueError(f'{kind} 没有阈值参数 {name}')
+            setattr(monitor, name, value)
+    return monitor
+
+
+def replay_day(kind: str, params: Dict[str, float], series: Dict[str, Series], day: date, interval: float = 60) -> dict:
+    """ 用模拟时钟跑完一天，返回提醒统计 """
+    clock = SimClock(_at(day, DAY_START))
+    sink = AlertSink(clock)
+    engine = TickEngine(interval=interval, client=ReplaySource(series, clock), outbox=sink,
+                        store=NullStore(), clock=clock, deliver=False)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # 监控每个 tick 的打印不需要
+        engine.register(make_monitor(kind, params, series, day), prepared=True)
+        engine.run()
+    alerts = sink.alerts
+    return {
+        'params': params, 'ticks': int(clock.elapsed // interval) + 1, 'alerts': len(alerts),
+        'bark': sum('bark' in a.channels for a in alerts),
+        'first': alerts[0].time.strftime('%H:%M') if alerts else '-',
+        'last': alerts[-1].time.strftime('%H:%M') if alerts else '-',
+        'ms': (time.perf_counter() - started) * 1000,
+    }
+
+
+def parse_grid(items: Sequence[str]) -> Dict[str, List[float]]:
+    """ name=1,2,3 或 name=start:stop:step（含 stop） """
+    grid = {}
+    for item in items:
+        name, _, values = item.partition('=')
+        if ':' in values:
+            start, stop, step = map(float, values.split(':'))
+            grid[name] = [round(v, 10) for v in np.arange(start, stop + step / 2, step)]
+        else:
+            grid[name] = [float(v) for v in values.split(',')]
+    return grid
+
+
+def sweep(kind: str, grid: Dict[str, List[float]], series: Dict[str, Series], day: date) -> List[dict]:
+    names = list(grid)
+    return [replay_day(kind, dict(zip(names, values)), series, day) for values in itertools.product(*grid.values())]
+
+
+def _last_weekday() -> date:
+    day = datetime.now(TZ).date()
+    while day.weekday() > 4:
+        day -= timedelta(days=1)
+    return day
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='盯盘告警逻辑回放/阈值扫描')
+    parser.add_argument('kind', choices=list(KINDS))
+    parser.add_argument('--day', help='回放行情库中的日期 YYYYMMDD，不给则用合成行情')
+    parser.add_argument('--synthetic', action='store_true', help='使用合成行情')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--grid', action='append', default=[], help='阈值参数，如 base_threshold=1.5:3:0.1')
+    args = parser.parse_args(argv)
+
+    day = _parse_day(args.day) if args.day else _last_weekday()
+    if args.synthetic or not args.day:
+        series = synthetic_series(args.kind, day, args.seed)
+        source = f'合成行情(seed={args.seed})'
+    else:
+        series = load_series(day, kind_symbols(args.kind))
+        source = f'行情库 {args.day}'
+    if not series:
+        print(f'{source} 没有 {args.kind} 的数据')
+        return
+
+    grid = parse_grid(args.grid) or {'nav': [0.0]}
+    started = time.perf_counter()
+    results = sweep(args.kind, grid, series, day)
+    total = time.perf_counter() - started
+
+    print(f'{args.kind} {day} {source}，{len(results)} 组参数，耗时 {total*1000:.0f}ms')
+    print(f"{'参数':<48}{'提醒':>6}{'Bark':>6}{'首次':>8}{'末次':>8}{'ms':>8}")
+    for r in results:
+        params = ' '.join(f'{k}={v:g}' for k, v in r['params'].items() if not (k == 'nav' and not v))
+        print(f"{params or '(默认)':<48}{r['alerts']:>6}{r['bark']:>6}{r['first']:>8}{r['last']:>8}{r['ms']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
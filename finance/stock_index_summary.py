@@ -1,18 +1,29 @@
 """ 指数播报
-@crontab: 45 14 * * 1-5 cd ${BASE_PATH} && python -m finance.stock_index_summary.py 2>&1 | tee -a logs/stock_index_summary.log
+@crontab: 45 14 * * 1-5 cd $reminder_home && $PYTHON -u -m finance.stock_index_summary 2>&1 | tee -a logs/stock_index_summary.log
+
+交易日判断、指数行情、恐惧贪婪指数三个数据源同时请求，各自有超时(SOURCE_TIMEOUTS)；
+某个源慢或失败只影响卡片里对应的一段，不拖延整个播报。
+common.http(requests)、easyquotation 在各自的数据源线程里才导入，导入本模块没有网络和重依赖开销。
 """
 
 import time
 import sys
 import json
 import base64
+import threading
+import contextvars
+from concurrent.futures import Future, TimeoutError
 from dotenv import dotenv_values
 
-import requests
-import easyquotation
+from common import metrics, upstream
+from common.notify import get_notifier
+from pyutils.date_util import now, now_time
+from finance.trade_calendar import trading_status
+
 
-from pyutils.notify_util import Feishu, Pushme
-from pyutils.date_util import now
+KJTL_URL = upstream.url('https://api.jiucaishuo.com/v2/kjtl/kjtlconnect')
+INDEX_CODES = ['sh000300', 'sh000905', 'sh000922', 'sh000919', 'sz399986', 'sz399975', 'sh512480', 'sh515790']
+SOURCE_TIMEOUTS = {'holiday': 5, 'quotes': 8, 'kjtl': 8}  # 从同时发出请求开始计算(秒)
 
 
 def add_color(txt):
@@ -21,23 +32,10 @@ def add_color(txt):
     else: 
         return "<font color='red'> %s </font>" % txt
 
-def get_holidays():
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36'}
-    try:
-        resp = requests.get('https://timor.tech/api/holiday/year', headers=headers)
-        holiday_json = resp.json()
-        if holiday_json.get('code', -1)==0 and 'holiday' in holiday_json:
-            holiday_dates = [month_day for month_day,info in holiday_json['holiday'].items() if info['holiday']]
-            print('holiday_dates = %s' % holiday_dates)
-            return holiday_dates
-    except Exception as e:
-        print(e)
-        return []
-
 def today_is_holiday():
-    today, holidays = time.strftime('%m-%d'), get_holidays()
-    if today in holidays:
-        print(f'今天{today}在工作日假期内{holidays}')
+    is_trading, reason = trading_status(now_time())
+    if not is_trading:
+        print(f'今天{now_time().strftime("%m-%d")}不是交易日: {reason}')
         return True
     return False
 
@@ -56,43 +54,92 @@ def new_my_decode(data):
     return decrypted.decode('utf-8')
 
 def get_kjtl_data():
-    url = "https://api.jiucaishuo.com/v2/kjtl/kjtlconnect"
+    from common import http
     payload = {
         "gu_code": '000001.SH',  # 000300.SH
         "type": "h5",
         "version": "2.4.5",
         "act_time": 1697623588394,
     }
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36'}
-    r = requests.post(url, headers=headers, json=payload)
+    r = http.post(KJTL_URL, json=payload, timeout=SOURCE_TIMEOUTS['kjtl'])
+    r.raise_for_status()
     data_json = r.json()
-    data_json = json.loads(new_my_decode(data_json))
+    with metrics.timer('parse_seconds', parser='kjtl'):
+        data_json = json.loads(new_my_decode(data_json))
     return data_json
 
-if __name__ == '__main__' and not today_is_holiday():
-    cfg = dotenv_values()
-    print(f'\n\n\n=============== {now()} ===============')
 
+def get_index_quotes():
+    import easyquotation
     quotation = easyquotation.use('qq')
-    data = quotation.stocks(['sh000300', 'sh000905', 'sh000922', 'sh000919', 'sz399986', 'sz399975', 'sh512480', 'sh515790'], prefix=True)
+    data = quotation.stocks(INDEX_CODES, prefix=True)
     print(data) # main_columns = ['code', 'name', 'now', 'close', '涨跌(%)', 'open', 'high', 'low', 'datetime']
+    return data
+
+
+def submit(func) -> Future:
+    """ 在守护线程里执行，超时放弃的请求不会阻塞进程退出；线程沿用当前 context（调度进程里的任务日志） """
+    future = Future()
+
+    def runner():
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=contextvars.copy_context().run, args=(runner,), daemon=True).start()
+    return future
+
+
+def wait_source(name, future, started):
+    """ 等待数据源结果，超时或出错返回 None """
+    try:
+        return future.result(timeout=max(0.0, started + SOURCE_TIMEOUTS[name] - time.monotonic()))
+    except TimeoutError:
+        print(f'[{name}] 超过 {SOURCE_TIMEOUTS[name]}s 未返回，跳过')
+    except Exception as e:
+        print(f'[{name}] 获取失败: {e}')
+    return None
+
+
+def main(argv=None):
+    started = time.monotonic()
+    futures = {
+        'holiday': submit(today_is_holiday),
+        'quotes': submit(get_index_quotes),
+        'kjtl': submit(get_kjtl_data),
+    }
+
+    is_holiday = wait_source('holiday', futures['holiday'], started)
+    if is_holiday:
+        return
+
+    cfg = dotenv_values()
+    print(f'\n\n\n=============== {now()} ===============')
 
     msg = ''
-    for info in data.values():
-        code = str(info['code']) if str(info['code'])[:2] not in ('sh', 'sz') else str(info['code'])[2:]
-        name = str(info['name'])
-        chgPct = str(info['涨跌(%)'])
-        more_link = f'[详情](https://quote.eastmoney.com/zs{code}.html)'
-        msg += '%s  %s  %s\n' % (name, add_color(chgPct+'%'), more_link)
-    
+    data = wait_source('quotes', futures['quotes'], started)
+    if data:
+        for info in data.values():
+            code = str(info['code']) if str(info['code'])[:2] not in ('sh', 'sz') else str(info['code'])[2:]
+            name = str(info['name'])
+            chgPct = str(info['涨跌(%)'])
+            more_link = f'[详情](https://quote.eastmoney.com/zs{code}.html)'
+            msg += '%s  %s  %s\n' % (name, add_color(chgPct+'%'), more_link)
+    else:
+        msg += '指数行情暂时获取不到\n'
+
+    data_json = wait_source('kjtl', futures['kjtl'], started)
     try:
-        data_json = get_kjtl_data()
-        x_dates = data_json.get('data', data_json)['xAxis']['categories']
         y_kjtl = data_json.get('data', data_json)['series'][0]['data']
         msg += '\n昨日恐惧贪婪指数：%.2f' % y_kjtl[-1]
     except Exception as e:
-        print(e)
+        if data_json is not None:
+            print(e)
+        msg += '\n昨日恐惧贪婪指数：暂时获取不到'
 
+    if is_holiday is None:
+        msg += '\n\n(交易日历获取失败，按交易日播报)'
 
     card_msg = {
         "title": "收盘前播报(%s)" % time.strftime('%Y-%m-%d %H:%M'), 
@@ -113,8 +160,12 @@ if __name__ == '__main__' and not today_is_holiday():
         ]
     }
 
-    try:
-        Feishu(cfg['FEISHU_WEBHOOK_TOKEN']).send_markdown_interactive(**card_msg)
-    finally:
-        Pushme(cfg['PUSHME_PUSH_KEY']).send_markdown('[#指数播报!指]'+card_msg['title'], card_msg['markdown_content'].replace('\n', '\n\n'))
+    notifier = get_notifier(cfg)
+    notifier.wait(notifier.dispatch({
+        'feishu': lambda: notifier.method('feishu', 'send_markdown_interactive')(**card_msg),
+        'pushme': lambda: notifier.method('pushme', 'send_markdown')('[#指数播报!指]'+card_msg['title'], card_msg['markdown_content'].replace('\n', '\n\n')),
+    }))
+
 
+if __name__ == '__main__':
+    main()
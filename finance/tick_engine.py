@@ -0,0 +1,152 @@
+""" 盘中监控统一驱动：一个轮询循环带动所有盯盘监控
+@crontab: 25 09 * * 1-5 cd $reminder_home && $PYTHON -u -m finance.tick_engine 2>&1 | tee -a logs/tick_engine.log
+
+每个 tick 把所有活跃监控关注的代码合并成一次批量行情请求，得到的快照依次交给各监控处理，
+增加监控品种不再增加进程、请求次数和定时唤醒。
+
+监控对象需要提供：
+- name: str                        日志中显示的名称
+- symbols: List[str]               关注的行情代码（带 sh/sz 前缀）
+- prepare() -> bool                注册后执行一次（如获取净值），返回 False 则不再参与
+- is_active(now) -> bool           当前是否需要行情（如是否交易时间）
+- is_finished(now) -> bool         当天是否已结束，结束后从引擎移除
+- on_tick(snapshot, now)           snapshot 为 {symbol: Quote}，本 tick 所有监控共享
+
+监控的提醒写入发件箱(common.outbox)，run() 期间由引擎启动的发送线程负责投递、合并和重试。
+每个 tick 的快照同时追加到行情库(finance.tick_store)，供事后回看和调阈值。
+时钟、行情源、发件箱和行情库都可以注入，finance.replay 用模拟时钟离线回放一整天。
+"""
+import time
+from typing import List
+
+from pyutils.date_util import now, now_time
+from common import metrics
+from common.notify import Notifier, get_notifier
+from common.outbox import Outbox, OutboxSender, get_outbox
+from finance.quote import QuoteClient, get_client
+from finance.tick_store import TickStore
+
+
+CHECK_INTERVAL = 60  # 轮询间隔(秒)
+
+
+class SystemClock:
+    """ 真实时钟；回放时替换为 finance.replay.SimClock """
+
+    def now(self):
+        return now_time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+
+class TickEngine:
+    def __init__(self, monitors=(), interval: float = CHECK_INTERVAL, client: QuoteClient = None,
+                 outbox: Outbox = None, notifier: Notifier = None, store: TickStore = None,
+                 clock: SystemClock = None, deliver: bool = True):
+        """
+        client: 提供 fetch(symbols) -> {symbol: Quote} 的行情源
+        outbox: 提醒的去处，给定时注入到各监控；deliver=False 时不启动发送线程（回放只记录不发送）
+        """
+        self.interval = interval
+        self.client = client or get_client()
+        self.store = store
+        self.outbox = outbox
+        self.notifier = notifier
+        self.clock = clock or SystemClock()
+        self.deliver = deliver
+        self.monitors: List = []
+        for monitor in monitors:
+            self.register(monitor)
+
+    def register(self, monitor, prepared: bool = False) -> bool:
+        """ prepared=True 表示监控状态已由调用方设置好（如回放），不再调用 prepare() """
+        try:
+            ready = prepared or monitor.prepare()
+        except Exception as e:
+            print(f"[引擎] {monitor.name} 初始化失败: {e}")
+            ready = False
+        if ready:
+            if self.outbox is not None:
+                monitor.outbox = self.outbox
+            self.monitors.append(monitor)
+            print(f"[引擎] 已注册 {monitor.name}: {','.join(monitor.symbols)}")
+        else:
+            print(f"[引擎] {monitor.name} 今天不参与监控")
+        return ready
+
+    def tick(self, current) -> int:
+        """ 执行一次轮询，返回本次请求的代码个数 """
+        for monitor in [m for m in self.monitors if m.is_finished(current)]:
+            self.monitors.remove(monitor)
+            print(f"[引擎] {monitor.name} 监控结束")
+
+        active = [m for m in self.monitors if m.is_active(current)]
+        if not active:
+            return 0
+
+        symbols = list(dict.fromkeys(s for m in active for s in m.symbols))
+        snapshot = self.client.fetch(symbols)
+        self.record(snapshot, current)
+        for monitor in active:
+            try:
+                monitor.on_tick(snapshot, current)
+            except Exception as e:
+                print(f"[引擎] {monitor.name} 处理行情出错: {e}")
+        return len(symbols)
+
+    def record(self, snapshot, current):
+        """ 快照落盘，失败只打印不影响监控 """
+        try:
+            if self.store is None:
+                self.store = TickStore()
+            self.store.append(current, snapshot)
+        except Exception as e:
+            print(f"[引擎] 行情落盘失败: {e}")
+
+    def run(self):
+        sender = None
+        if self.deliver:
+            sender = OutboxSender(self.outbox or get_outbox(), self.notifier or get_notifier()).start()
+        try:
+            while self.monitors:
+                started = self.clock.monotonic()
+                with metrics.timer('stage_seconds', stage='tick'):
+                    self.tick(self.clock.now())
+                metrics.maybe_flush()
+                if not self.monitors:
+                    break
+                self.clock.sleep(max(0.0, self.interval - (self.clock.monotonic() - started)))
+        except KeyboardInterrupt:
+            print("\n监控已停止")
+        finally:
+            if sender is not None:
+                sender.stop()
+            if self.store is not None:
+                self.store.close()
+
+
+def main(argv=None):
+    from dotenv import dotenv_values
+    from finance.discount_511880 import FundMonitor
+    from finance.discount_huabao import HuaBaoMonitor
+    from finance.gznhg import RepoMonitor
+    from finance.mmf_scanner import UNIVERSE, MMFScanner
+
+    ENV = dotenv_values()
+    print(f'\n\n\n=============== {now()} ===============')
+
+    engine = TickEngine(notifier=get_notifier(ENV))
+    engine.register(FundMonitor('511880', ENV))
+    engine.register(HuaBaoMonitor('511990', low_price=99.993, env=ENV))
+    engine.register(RepoMonitor(ENV))
+    # 511880/511990 保留各自的监控规则（Bark 升级、低价阈值），其余货币ETF由扫描器一起盯
+    engine.register(MMFScanner([code for code in UNIVERSE if code not in ('511880', '511990')], ENV))
+    engine.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+""" 盘中行情落盘：定长记录追加写入按天分文件的 mmap
+
+盯盘引擎每个 tick 看到的价格原来只打印到日志，调阈值时没有历史可用。
+这里每个观测值写一条 24 字节定长记录，追加到 data/ticks/YYYYMMDD.bin：
+
+    文件头 16 字节: b'TICK' + uint32 版本 + uint64 已写记录数
+    记录   24 字节: int64 时间戳(ms) | uint32 代码id | float64 价格 | float32 涨跌幅(%)
+
+代码与 id 的对应关系保存在 data/ticks/symbols.json。写入只是 struct.pack_into 到 mmap，
+文件按 GROW_RECORDS 条预分配，写满再扩容；记录数在记录写完后才更新，进程中途退出不会读到半条记录。
+读取直接把文件映射成 numpy 结构化数组，不解析文本。同一天只应有一个写入进程（盯盘引擎）。
+
+用法:
+    store = TickStore()
+    store.append(now_time(), snapshot)            # {symbol: Quote}
+    day = store.read_day('20250102')              # 结构化数组，字段 ts/sid/price/pct
+    ticks = store.read_symbol('sh511880', '20250101', '20250131')
+"""
+import json
+import mmap
+import os
+import struct
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from finance.quote import Quote, to_symbol
+
+
+TICK_DIR = Path(__file__).resolve().parent.parent / 'data' / 'ticks'
+MAGIC = b'TICK'
+VERSION = 1
+HEADER = struct.Struct('<4sIQ')
+RECORD = struct.Struct('<qIdf')
+GROW_RECORDS = 8192  # 每次扩容的记录条数(约192KB)，一天几个品种每分钟一条用不完一次
+
+DTYPE_SPEC = [('ts', '<i8'), ('sid', '<u4'), ('price', '<f8'), ('pct', '<f4')]
+
+
+def _day_str(day: Union[str, date]) -> str:
+    return day if isinstance(day, str) else day.strftime('%Y%m%d')
+
+
+class _DayFile:
+    """ 单日文件的追加写入 """
+
+    def __init__(self, path: Path):
+        self.path = path
+        fresh = not path.exists() or path.stat().st_size < HEADER.size
+        self.file = open(path, 'r+b' if path.exists() else 'w+b')
+        if fresh:
+            self.file.truncate(HEADER.size + GROW_RECORDS * RECORD.size)
+        self.mm = mmap.mmap(self.file.fileno(), 0)
+        if fresh:
+            HEADER.pack_into(self.mm, 0, MAGIC, VERSION, 0)
+        magic, _, self.count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} 不是行情文件')
+
+    def _grow(self):
+        self.mm.flush()
+        self.mm.close()
+        size = os.fstat(self.file.fileno()).st_size + GROW_RECORDS * RECORD.size
+        self.file.truncate(size)
+        self.mm = mmap.mmap(self.file.fileno(), size)
+
+    def append(self, ts: int, sid: int, price: float, pct: float):
+        offset = HEADER.size + self.count * RECORD.size
+        if offset + RECORD.size > len(self.mm):
+            self._grow()
+        RECORD.pack_into(self.mm, offset, ts, sid, price, pct)
+        self.count += 1
+        struct.pack_into('<Q', self.mm, 8, self.count)
+
+    def close(self):
+        self.mm.flush()
+        self.mm.close()
+        self.file.close()
+
+
+class TickStore:
+    def __init__(self, root: Path = TICK_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.symbols_path = self.root / 'symbols.json'
+        self.symbols: Dict[str, int] = {}
+        if self.symbols_path.exists():
+            self.symbols = json.loads(self.symbols_path.read_text(encoding='utf-8'))
+        self.names = {sid: symbol for symbol, sid in self.symbols.items()}
+        self._day: Optional[str] = None
+        self._file: Optional[_DayFile] = None
+
+    def symbol_id(self, symbol: str, create: bool = True) -> Optional[int]:
+        symbol = to_symbol(symbol)
+        if symbol not in self.symbols and create:
+            self.symbols[symbol] = len(self.symbols)
+            self.names[self.symbols[symbol]] = symbol
+            tmp = self.symbols_path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(self.symbols, ensure_ascii=False, indent=1), encoding='utf-8')
+            tmp.replace(self.symbols_path)
+        return self.symbols.get(symbol)
+
+    def _day_file(self, day: str) -> _DayFile:
+        if day != self._day:
+            self.close()
+            self._file, self._day = _DayFile(self.root / f'{day}.bin'), day
+        return self._file
+
+    def append(self, now: datetime, snapshot: Dict[str, Quote]) -> int:
+        """ 一个 tick 的快照全部写入 now 所在日期的文件，返回写入条数 """
+        day_file = self._day_file(_day_str(now))
+        ts = int(now.timestamp() * 1000)
+        for symbol, quote in snapshot.items():
+            day_file.append(ts, self.symbol_id(symbol), quote.price, quote.pct)
+        return len(snapshot)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file, self._day = None, None
+
+    def read_day(self, day: Union[str, date]):
+        """ 读取一天的全部记录，返回 numpy 结构化数组（文件不存在返回空数组） """
+        import numpy as np
+
+        dtype = np.dtype(DTYPE_SPEC)
+        path = self.root / f'{_day_str(day)}.bin'
+        if not path.exists():
+            return np.empty(0, dtype=dtype)
+        with open(path, 'rb') as f:
+            magic, _, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f'{path} 不是行情文件')
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', offset=HEADER.size, shape=(count,))
+
+    def read_symbol(self, symbol: str, start: Union[str, date], end: Union[str, date, None] = None):
+        """ 读取某个代码在 [start, end] 日期范围内的记录，按时间顺序拼接 """
+        import numpy as np
+
+        sid = self.symbol_id(symbol, create=False)
+        start, end = _day_str(start), _day_str(end or start)
+        days = sorted(p.stem for p in self.root.glob('*.bin') if start <= p.stem <= end)
+        parts = [day[day['sid'] == sid] for day in map(self.read_day, days)] if sid is not None else []
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.dtype(DTYPE_SPEC))
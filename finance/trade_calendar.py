@@ -0,0 +1,201 @@
+""" A股交易日历
+
+节假日数据来自 timor.tech，每年只下载一次并保存到 data/holiday_<年>.json，
+之后即使没有网络也能使用（缓存也没有时降级为只判断周末）。只有需要下载时才导入 common.http(requests)。
+降级的年份在常驻进程里不会一直沿用：缓存文件出现或重试间隔已过时，下次查询会重建索引。
+
+加载后按天预计算稠密索引（以起始年份1月1日起的天数为下标）：
+- trading[i]      第 i 天是否交易日
+- next_trading[i] 第 i 天之后（不含当天）的下一个交易日下标
+所以 is_trading_day / next_trading_day / earn_days 都是 O(1) 查表。
+常驻调度进程里多个任务线程共用 CALENDAR：查询和重建在同一把锁内，重建先在局部变量里算好再一次替换。
+
+用法:
+    from finance.trade_calendar import is_trading_day, next_trading_day, earn_days
+"""
+import json
+import threading
+import time
+from array import array
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Set, Tuple, Union
+
+from common import upstream
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+HOLIDAY_API = upstream.url('https://timor.tech/api/holiday/year/{year}')
+RETRY_INTERVAL = 86400  # 下载失败（如次年数据尚未公布、没有网络）后，一天内不再重试
+CHECK_INTERVAL = 600    # 有降级年份时，查询时最多每隔这么久检查一次是否需要重建
+
+DateLike = Union[date, datetime]
+
+
+def _holiday_files(year: int) -> Tuple[Path, Path]:
+    """ (节假日缓存, 下载失败标记) """
+    return DATA_DIR / f'holiday_{year}.json', DATA_DIR / f'holiday_{year}.miss'
+
+
+def _load_holidays(year: int) -> Dict[str, dict]:
+    """
+    读取指定年份的节假日数据，本地没有缓存时才请求 timor.tech
+    返回格式: {"10-01": {"holiday": true, "name": "国庆节", ...}, ...}
+    """
+    cache_file, miss_file = _holiday_files(year)
+    if cache_file.exists():
+        try:
+            return json.loads(cache_file.read_text(encoding='utf-8'))
+        except ValueError as e:
+            print(f"读取 {cache_file} 失败: {e}")
+    if miss_file.exists() and time.time() - miss_file.stat().st_mtime < RETRY_INTERVAL:
+        return {}
+
+    try:
+        from common import http
+        response = http.get(HOLIDAY_API.format(year=year))
+        response.raise_for_status()
+        data = response.json()
+    except Exception as e:
+        print(f"获取 {year} 年节假日数据失败: {e}")
+        data = {}
+
+    holidays = data.get('holiday', {}) if data.get('code') == 0 else {}
+    DATA_DIR.mkdir(exist_ok=True)
+    if holidays:
+        cache_file.write_text(json.dumps(holidays, ensure_ascii=False), encoding='utf-8')
+        miss_file.unlink(missing_ok=True)
+    else:
+        # 不写缓存，过一段时间再试；本次降级为仅判断周末
+        miss_file.touch()
+    return holidays
+
+
+class TradeCalendar:
+    """
+    A股交易日规则：
+    1. 周六周日 -> 休市
+    2. 法定节假日(周一至周五) -> 休市
+    3. 调休上班的周末 -> A股依然休市
+    """
+
+    def __init__(self):
+        self.start_year = self.end_year = None
+        self.base = date.min
+        self.trading = bytearray()
+        self.next_trading = array('i')
+        self.reasons: Dict[int, str] = {}  # 非周末的休市日 -> 节假日名称
+        self.missing: Set[int] = set()     # 没有节假日数据、只按周末计算的年份
+        self.checked = 0.0
+        self.lock = threading.RLock()  # 查表和重建互斥，重建可能在 _index 里发生
+
+    def _build(self, start_year: int, end_year: int):
+        """ 预计算 [start_year, end_year] 的索引 """
+        base = date(start_year, 1, 1)
+        days = (date(end_year + 1, 1, 1) - base).days
+
+        trading = bytearray(days)
+        reasons, missing = {}, set()
+        for year in range(start_year, end_year + 1):
+            holidays = _load_holidays(year)
+            if not holidays:
+                missing.add(year)
+            offset = (date(year, 1, 1) - base).days
+            for i in range((date(year + 1, 1, 1) - date(year, 1, 1)).days):
+                day = base + timedelta(days=offset + i)
+                if day.weekday() >= 5:
+                    continue
+                info = holidays.get(day.strftime('%m-%d'))
+                if info and info.get('holiday') is True:
+                    reasons[offset + i] = info.get('name', '节假日')
+                    continue
+                trading[offset + i] = 1
+
+        # 从后往前填充“下一个交易日”，年底找不到时指向末尾之外，查询时再扩展一年
+        next_trading = array('i', [days] * days)
+        upcoming = days
+        for i in range(days - 1, -1, -1):
+            next_trading[i] = upcoming
+            if trading[i]:
+                upcoming = i
+
+        (self.start_year, self.end_year, self.base, self.trading, self.next_trading, self.reasons,
+         self.missing, self.checked) = start_year, end_year, base, trading, next_trading, reasons, missing, time.time()
+
+    def _stale(self) -> bool:
+        """ 降级年份的缓存文件已出现，或下载失败标记已过重试间隔 """
+        current = time.time()
+        if not self.missing or current - self.checked < CHECK_INTERVAL:
+            return False
+        self.checked = current
+        for year in self.missing:
+            cache_file, miss_file = _holiday_files(year)
+            if cache_file.exists() or not miss_file.exists() or current - miss_file.stat().st_mtime >= RETRY_INTERVAL:
+                return True
+        return False
+
+    def _index(self, day: DateLike) -> int:
+        if isinstance(day, datetime):
+            day = day.date()
+        if self.start_year is None or not (self.start_year <= day.year <= self.end_year):
+            start = day.year if self.start_year is None else min(self.start_year, day.year)
+            end = day.year if self.end_year is None else max(self.end_year, day.year)
+            self._build(start, end)
+        elif self._stale():
+            self._build(self.start_year, self.end_year)
+        return (day - self.base).days
+
+    def trading_status(self, day: DateLike) -> Tuple[bool, str]:
+        """ 返回 (是否交易日, 原因)，原因用于日志输出 """
+        with self.lock:
+            i = self._index(day)
+            if self.trading[i]:
+                return True, "交易日"
+            if i in self.reasons:
+                return False, f"休市 ({self.reasons[i]})"
+        return False, "休市 (周末)"
+
+    def is_trading_day(self, day: DateLike) -> bool:
+        with self.lock:
+            i = self._index(day)  # 先取下标：_index 可能重建并替换 self.trading
+            return bool(self.trading[i])
+
+    def next_trading_day(self, day: DateLike) -> date:
+        """ day 之后（不含当天）的下一个交易日 """
+        with self.lock:
+            i = self._index(day)
+            j = self.next_trading[i]
+            if j >= len(self.trading):
+                self._build(self.start_year, self.end_year + 1)  # 起始年份不变，下标 i 仍然有效
+                j = self.next_trading[i]
+            return self.base + timedelta(days=j)
+
+    def earn_days(self, day: DateLike) -> int:
+        """
+        day 当天更新的净值包含的收益天数，即到下一个交易日的天数
+        - 周一到周四：1天
+        - 周五：3天（周五、周六、周日）
+        - 节假日前一天：包含假期的所有天数
+        """
+        if isinstance(day, datetime):
+            day = day.date()
+        return (self.next_trading_day(day) - day).days
+
+
+CALENDAR = TradeCalendar()
+
+
+def trading_status(day: DateLike) -> Tuple[bool, str]:
+    return CALENDAR.trading_status(day)
+
+
+def is_trading_day(day: DateLike) -> bool:
+    return CALENDAR.is_trading_day(day)
+
+
+def next_trading_day(day: DateLike) -> date:
+    return CALENDAR.next_trading_day(day)
+
+
+def earn_days(day: DateLike) -> int:
+    return CALENDAR.earn_days(day)
@@ -1,22 +1,25 @@
 """ 下班前查看天气是否下雨
-@crontab: 50 17 * * * cd ${BASE_PATH} && python -m life.rain_offwork 2>&1 | tee -a logs/rain_offwork.log
+@crontab: 50 17 * * 1-5 cd $reminder_home && $PYTHON -u -m life.rain_offwork 2>&1 | tee -a logs/rain_offwork.log
 """
 
-import sys
 import time
 from datetime import datetime
 
-import requests
 from dotenv import dotenv_values
-from pyutils.notify_util import Feishu, Pushme
+from common import upstream
+from common.notify import get_notifier
 from pyutils.date_util import now
 
 
+WEATHER_API = upstream.url('https://api.open-meteo.com/v1/forecast')
+
+
 def get_huangpu_weather():
     """
     获取广州黄埔区天气并判断降雨情况
     接口来源: Open-Meteo (无需API Key, 免费稳定)
     """
+    from common import http
     print(f"[{datetime.now().strftime('%H:%M:%S')}] 正在获取天气数据...")
 
     # 广州市黄埔区的大致经纬度
@@ -26,7 +29,7 @@ def get_huangpu_weather():
     # 构建请求 URL
     # current=weather_code,rain: 获取当前天气代码和降雨量(mm)
     # timezone=Asia/Shanghai: 设定时区
-    url = "https://api.open-meteo.com/v1/forecast"
+    url = WEATHER_API
     params = {
         "latitude": latitude,
         "longitude": longitude,
@@ -35,7 +38,7 @@ def get_huangpu_weather():
     }
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http.get(url, params=params)
         response.raise_for_status()
         data = response.json(); print(data)
 
@@ -47,7 +50,7 @@ def get_huangpu_weather():
         # 判断并输出结果
         return analyze_rain(weather_code, rain_mm)
 
-    except requests.exceptions.RequestException as e:
+    except http.RequestException as e:
         print(f"网络请求出错: {e}")
     except Exception as e:
         print(f"程序发生未知错误: {e}")
@@ -95,7 +98,7 @@ def analyze_rain(code, rain_mm):
     return is_raining, '\n'.join(results)
 
 
-if __name__ == '__main__':
+def main(argv=None):
     cfg = dotenv_values()
     print(f'\n\n\n=============== {now()} ===============')
 
@@ -105,11 +108,10 @@ if __name__ == '__main__':
     else:
         title, content, is_raining = '下雨提醒', result[-1], result[0]
         if not is_raining:
-            sys.exit(0)
+            return
+
+    get_notifier(cfg).send_markdown(title, content, cate='', icon='😀')
 
-    try:
-        Feishu(cfg['FEISHU_WEBHOOK_TOKEN']).send_markdown(title, content)
-    finally:
-        cate, icon = '', '😀'
-        Pushme(cfg['PUSHME_PUSH_KEY']).send_markdown(f'[#{cate}!{icon}]'+title, content)
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+""" 常驻调度进程：在同一个预热好的解释器里按 @crontab 计划运行所有任务
+
+替代 crontab.txt 中每个任务单独起一个 python 进程的方式：
+- 只解析 finance/、life/ 下各模块源码 docstring 中的 `@crontab:` 行（不导入），得到计划和参数
+- 启动时预先导入全部任务模块，requests/openai/easyquotation 等只加载一次，
+  模块级 Session 和缓存在各任务之间共享
+- 到点后在线程池中调用模块的 main(argv)，长时间运行的盯盘任务不会阻塞其他任务
+- 同一任务上次还没结束时跳过本次触发
+- 每个任务的 print 输出分流到 logs/<模块名>.log，和原来 tee 的日志文件保持一致；
+  日志流记在 contextvars 里，任务自己起的线程（通知发送、发件箱投递、指数播报的数据源线程）
+  用 contextvars.copy_context().run 运行，输出也进同一个日志；任务结束后才打印的内容写到调度进程的标准输出
+
+用法:
+    python -m scheduler                              # 常驻运行
+    python -m scheduler --list                       # 查看任务及下次运行时间
+    python -m scheduler --run finance.lof_discount   # 立即运行一次指定任务
+"""
+import argparse
+import ast
+import asyncio
+import contextvars
+import importlib
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import FrozenSet, List, Optional
+
+from common import metrics
+from pyutils.date_util import now, now_time
+
+
+ROOT = Path(__file__).resolve().parent
+JOB_PACKAGES = ('finance', 'life')
+LOG_DIR = ROOT / 'logs'
+MAX_WORKERS = 16
+
+CRONTAB_RE = re.compile(r'@crontab:\s*((?:\S+\s+){4}\S+)\s+(.*)')
+# (最小值, 最大值) 依次为: 分 时 日 月 周
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def parse_cron_field(expr: str, low: int, high: int) -> FrozenSet[int]:
+    """ 解析单个 cron 字段，支持 *、a-b、a,b、*/n、a-b/n """
+    values = set()
+    for part in expr.split(','):
+        step = 1
+        if '/' in part:
+            part, step_str = part.split('/', 1)
+            step = int(step_str)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(x) for x in part.split('-', 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f'cron 字段超出范围: {expr}')
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSpec:
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f'cron 表达式需要5个字段: {expr}')
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            parse_cron_field(f, low, high) for f, (low, high) in zip(fields, FIELD_RANGES))
+        self.weekdays = frozenset(d % 7 for d in weekdays)  # 0和7都表示周日
+        # 与 cron 一致：日、周都有限制时满足其一即可
+        self.day_any, self.weekday_any = fields[2] == '*', fields[4] == '*'
+
+    def match_day(self, dt: datetime) -> bool:
+        if dt.month not in self.months:
+            return False
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self.day_any or self.weekday_any:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def match(self, dt: datetime) -> bool:
+        return dt.minute in self.minutes and dt.hour in self.hours and self.match_day(dt)
+
+    def next_after(self, dt: datetime) -> Optional[datetime]:
+        """ 严格晚于 dt 的下一次触发时间（一年内找不到返回None） """
+        start = dt.replace(second=0, microsecond=0)
+        for offset in range(367):
+            day = start + timedelta(days=offset)
+            if not self.match_day(day):
+                continue
+            for hour in sorted(self.hours):
+                for minute in sorted(self.minutes):
+                    candidate = day.replace(hour=hour, minute=minute)
+                    if candidate > dt:
+                        return candidate
+        return None
+
+
+@dataclass
+class Job:
+    module: str
+    argv: List[str]
+    spec: CronSpec
+    running: bool = field(default=False, compare=False)
+
+    @property
+    def name(self) -> str:
+        return self.module.rsplit('.', 1)[-1]
+
+
+def parse_crontab_line(line: str):
+    """ `@crontab: 30 09 * * 1-5 cd ... && $PYTHON -u -m finance.xxx arg 2>&1 | tee ...` -> (表达式, 参数) """
+    m = CRONTAB_RE.search(line)
+    if not m:
+        return None
+    tokens = m.group(2).split('|')[0].split()
+    argv = []
+    if '-m' in tokens:
+        for token in tokens[tokens.index('-m') + 2:]:
+            if token.startswith(('>', '2>', '&', ';')):
+                break
+            argv.append(token)
+    return m.group(1), argv
+
+
+def discover_jobs(packages=JOB_PACKAGES) -> List[Job]:
+    jobs = []
+    for package in packages:
+        for path in sorted((ROOT / package).glob('*.py')):
+            try:
+                doc = ast.get_docstring(ast.parse(path.read_text(encoding='utf-8'))) or ''
+            except SyntaxError as e:
+                print(f'[调度] 跳过无法解析的模块 {path}: {e}')
+                continue
+            for line in doc.splitlines():
+                parsed = parse_crontab_line(line)
+                if parsed:
+                    expr, argv = parsed
+                    jobs.append(Job(f'{package}.{path.stem}', argv, CronSpec(expr)))
+    return jobs
+
+
+class ThreadLogRouter:
+    """
+    sys.stdout/sys.stderr 的替身：任务的输出写到各自的日志文件，其余写到原始流
+    绑定的日志流存在 ContextVar 里，复制了任务 context 的线程也写到同一个文件
+    """
+
+    def __init__(self, default):
+        self.default = default
+        self.current = contextvars.ContextVar(f'log_stream_{id(self)}', default=None)
+
+    @property
+    def stream(self):
+        stream = self.current.get()
+        return self.default if stream is None or stream.closed else stream
+
+    def bind(self, stream) -> contextvars.Token:
+        return self.current.set(stream)
+
+    def unbind(self, token: contextvars.Token):
+        self.current.reset(token)
+
+    def write(self, text):
+        n = self.stream.write(text)
+        self.stream.flush()
+        return n
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.default, name)
+
+
+def call_job(job: Job, argv: Optional[List[str]] = None):
+    """ 在当前线程运行任务，输出写入 logs/<name>.log """
+    routers = [s for s in (sys.stdout, sys.stderr) if isinstance(s, ThreadLogRouter)]
+    LOG_DIR.mkdir(exist_ok=True)
+    with open(LOG_DIR / f'{job.name}.log', 'a', encoding='utf-8') as log_file:
+        tokens = [router.bind(log_file) for router in routers]
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(job.module)
+            module.main(job.argv if argv is None else argv)
+        except SystemExit:
+            pass
+        except Exception:
+            traceback.print_exc()
+        finally:
+            metrics.observe('job_seconds', time.perf_counter() - started, module=job.module)
+            metrics.flush()
+            for router, token in zip(routers, tokens):
+                router.unbind(token)
+
+
+class Scheduler:
+    def __init__(self, jobs: List[Job], max_workers: int = MAX_WORKERS):
+        self.jobs = jobs
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.tasks = set()
+
+    def preload(self):
+        """ 预先导入全部任务模块，后续触发不再有导入开销 """
+        for job in self.jobs:
+            try:
+                importlib.import_module(job.module)
+            except Exception as e:
+                print(f'[调度] 预加载 {job.module} 失败: {e}')
+
+    async def run_job(self, job: Job):
+        if job.running:
+            print(f'[调度] {now()} {job.module} 上次运行尚未结束，跳过')
+            return
+        job.running = True
+        print(f'[调度] {now()} 启动 {job.module} {" ".join(job.argv)}')
+        started = now_time()
+        try:
+            await asyncio.get_running_loop().run_in_executor(self.executor, call_job, job)
+        finally:
+            job.running = False
+            elapsed = (now_time() - started).total_seconds()
+            print(f'[调度] {now()} 结束 {job.module} 耗时{elapsed:.1f}秒')
+
+    async def serve(self):
+        print(f'[调度] {now()} 已加载 {len(self.jobs)} 个任务')
+        while True:
+            current = now_time()
+            tick = current.replace(second=0, microsecond=0) + timedelta(minutes=1)
+            await asyncio.sleep(max(0.0, (tick - now_time()).total_seconds()))
+            for job in self.jobs:
+                if job.spec.match(tick):
+                    task = asyncio.create_task(self.run_job(job))
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='subscription_reminder 常驻调度进程')
+    parser.add_argument('--list', action='store_true', help='列出任务及下次运行时间')
+    parser.add_argument('--run', metavar='MODULE', help='立即运行一次指定任务，如 finance.lof_discount')
+    args = parser.parse_args(argv)
+
+    jobs = discover_jobs()
+    if args.list:
+        current = now_time()
+        for job in jobs:
+            print(f'{job.spec.expr:<20} {job.module:<32} {" ".join(job.argv):<10} 下次: {job.spec.next_after(current)}')
+        return
+    if args.run:
+        job = next((j for j in jobs if args.run in (j.module, j.name)), None)
+        if job is None:
+            job = Job(args.run, [], CronSpec('* * * * *'))
+        call_job(job)
+        return
+
+    sys.stdout = ThreadLogRouter(sys.stdout)
+    sys.stderr = ThreadLogRouter(sys.stderr)
+    scheduler = Scheduler(jobs)
+    scheduler.preload()
+    try:
+        asyncio.run(scheduler.serve())
+    except KeyboardInterrupt:
+        print('[调度] 已停止')
+
+
+if __name__ == '__main__':
+    main()
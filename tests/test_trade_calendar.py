@@ -0,0 +1,73 @@
+""" finance.trade_calendar：节假日数据写在临时目录，不访问网络
+
+    python -m pytest tests
+"""
+import json
+from datetime import date
+
+import pytest
+
+from finance import trade_calendar
+from finance.trade_calendar import TradeCalendar
+
+
+HOLIDAYS = {
+    2025: {'10-01': {'holiday': True, 'name': '国庆节'}},
+    2026: {'01-01': {'holiday': True, 'name': '元旦'}, '10-01': {'holiday': True, 'name': '国庆节'}},
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(trade_calendar, 'DATA_DIR', tmp_path)
+    for year, holidays in HOLIDAYS.items():
+        (tmp_path / f'holiday_{year}.json').write_text(json.dumps(holidays, ensure_ascii=False), encoding='utf-8')
+    return tmp_path
+
+
+def test_first_query_builds_range(data_dir):
+    assert TradeCalendar().is_trading_day(date(2026, 10, 16)) is True
+
+
+@pytest.mark.parametrize('day, expected', [
+    (date(2025, 12, 28), False),  # 周日
+    (date(2025, 12, 29), True),
+    (date(2025, 10, 1), False),   # 国庆节
+])
+def test_query_before_built_range(data_dir, day, expected):
+    calendar = TradeCalendar()
+    assert calendar.is_trading_day(date(2026, 6, 1)) is True
+    assert calendar.is_trading_day(day) is expected
+    assert calendar.trading_status(day)[0] is expected
+
+
+def test_next_trading_day_across_year(data_dir):
+    calendar = TradeCalendar()
+    assert calendar.next_trading_day(date(2025, 12, 31)) == date(2026, 1, 2)
+    assert calendar.earn_days(date(2025, 12, 31)) == 2
+
+
+def test_rebuild_after_holidays_become_available(data_dir):
+    (data_dir / 'holiday_2026.json').unlink()
+    (data_dir / 'holiday_2026.miss').touch()  # 刚下载失败，重试间隔内不再请求
+    calendar = TradeCalendar()
+    assert calendar.is_trading_day(date(2026, 10, 1)) is True  # 降级为只判断周末
+    assert calendar.missing == {2026}
+
+    (data_dir / 'holiday_2026.json').write_text(json.dumps(HOLIDAYS[2026]), encoding='utf-8')
+    assert calendar.is_trading_day(date(2026, 10, 1)) is True  # 检查间隔内沿用
+    calendar.checked -= trade_calendar.CHECK_INTERVAL
+    assert calendar.is_trading_day(date(2026, 10, 1)) is False
+    assert calendar.missing == set()
+
+
+def test_concurrent_queries_while_range_grows(data_dir):
+    from concurrent.futures import ThreadPoolExecutor
+    for year in (2023, 2024):
+        (data_dir / f'holiday_{year}.json').write_text('{}', encoding='utf-8')
+    calendar = TradeCalendar()
+    calendar.is_trading_day(date(2026, 6, 1))
+    days = [date(year, 12, 28) for year in (2026, 2025, 2024, 2023)] * 50
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        got = list(pool.map(calendar.is_trading_day, days))
+    assert got == [day.weekday() < 5 for day in days]